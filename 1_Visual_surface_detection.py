@@ -1,12 +1,24 @@
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+import matplotlib.colors as mcolors
 import numpy as np
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+
+# Shape geometry shared by the matplotlib and raster paths (graphics.h units)
+TRIANGLE = [(10, 100), (50, 20), (100, 100)]
+CIRCLE = (100, 100, 45)
+RECTANGLE = (100, 100, 80, 80)
 
 
 def drawTriangle(ax):
     """Draw a filled green triangle"""
-    x = [10, 50, 100]
-    y = [100, 20, 100]
+    x = [point[0] for point in TRIANGLE]
+    y = [point[1] for point in TRIANGLE]
 
     # Create triangle polygon
     triangle = patches.Polygon([(x[i], y[i]) for i in range(3)],
@@ -17,18 +29,457 @@ def drawTriangle(ax):
 def drawCircle(ax):
     """Draw a filled blue circle"""
     circle = patches.Circle(
-        (100, 100), 45, facecolor='blue', edgecolor='blue', linewidth=2)
+        CIRCLE[:2], CIRCLE[2], facecolor='blue', edgecolor='blue', linewidth=2)
     ax.add_patch(circle)
 
 
 def drawRectangle(ax):
     """Draw a filled red rectangle"""
     rectangle = patches.Rectangle(
-        (100, 100), 80, 80, facecolor='red', edgecolor='red', linewidth=2)
+        RECTANGLE[:2], RECTANGLE[2], RECTANGLE[3], facecolor='red', edgecolor='red', linewidth=2)
     ax.add_patch(rectangle)
 
 
-def main():
+def to_rgba8(colors, count):
+    """Matplotlib color spec(s) as an (count, 4) uint8 array"""
+    rgba = mcolors.to_rgba_array(colors)
+    rgba = np.round(rgba * 255).astype(np.uint8)
+    return np.broadcast_to(rgba, (count, 4)) if len(rgba) == 1 else rgba
+
+
+class ShapeList:
+    """Filled rectangles, circles and polygons in painter (sequence) order
+
+    Each kind is kept as arrays plus the sequence index of every shape, so
+    large scenes can be added in bulk and rasterized without Python loops.
+    Coordinates are in pixels with y pointing down, as in graphics.h.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._colors = []
+        self._rectangles = []
+        self._circles = []
+        self._polygons = []
+
+    def __len__(self):
+        return self.count
+
+    def _claim(self, count, colors):
+        ids = np.arange(self.count, self.count + count)
+        self.count += count
+        self._colors.append((to_rgba8(colors, count),))
+        return ids
+
+    def add_rectangles(self, rectangles, colors):
+        """Append (N, 4) x, y, width, height rectangles"""
+        rectangles = np.asarray(rectangles, dtype=float).reshape(-1, 4)
+        ids = self._claim(len(rectangles), colors)
+        self._rectangles.append((ids, rectangles))
+
+    def add_circles(self, circles, colors):
+        """Append (N, 3) center x, center y, radius circles"""
+        circles = np.asarray(circles, dtype=float).reshape(-1, 3)
+        ids = self._claim(len(circles), colors)
+        self._circles.append((ids, circles))
+
+    def add_polygons(self, points, sizes, colors):
+        """Append polygons given as stacked (V, 2) points and vertex counts"""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        sizes = np.asarray(sizes, dtype=np.int64).reshape(-1)
+        ids = self._claim(len(sizes), colors)
+        self._polygons.append((ids, points, sizes))
+
+    def add_rectangle(self, x, y, width, height, color):
+        self.add_rectangles([(x, y, width, height)], color)
+
+    def add_circle(self, x, y, radius, color):
+        self.add_circles([(x, y, radius)], color)
+
+    def add_polygon(self, points, color):
+        points = np.asarray(points, dtype=float)
+        self.add_polygons(points, [len(points)], color)
+
+    @staticmethod
+    def _merge(parts, empty):
+        """Concatenate a kind's appended parts once, in place"""
+        if not parts:
+            return empty
+        if len(parts) > 1:
+            parts[:] = [tuple(np.concatenate(arrays) for arrays in zip(*parts))]
+        return parts[0]
+
+    @property
+    def colors(self):
+        return self._merge(self._colors, (np.empty((0, 4), np.uint8),))[0]
+
+    @property
+    def rectangles(self):
+        """(ids, (N, 4) rectangles)"""
+        return self._merge(self._rectangles, (np.empty(0, np.int64), np.empty((0, 4))))
+
+    @property
+    def circles(self):
+        """(ids, (N, 3) circles)"""
+        return self._merge(self._circles, (np.empty(0, np.int64), np.empty((0, 3))))
+
+    @property
+    def polygons(self):
+        """(ids, (V, 2) points, (N,) vertex counts)"""
+        return self._merge(self._polygons, (np.empty(0, np.int64), np.empty((0, 2)),
+                                            np.empty(0, np.int64)))
+
+    def bounds(self):
+        """(count, 4) x_min, y_min, x_max, y_max of every shape, by sequence id"""
+        bounds = np.full((self.count, 4), np.nan)
+        ids, rectangles = self.rectangles
+        x, y, w, h = rectangles.T
+        bounds[ids] = np.stack([np.minimum(x, x + w), np.minimum(y, y + h),
+                                np.maximum(x, x + w), np.maximum(y, y + h)], axis=1)
+        ids, circles = self.circles
+        cx, cy, r = circles.T
+        r = np.abs(r)
+        bounds[ids] = np.stack([cx - r, cy - r, cx + r, cy + r], axis=1)
+        ids, points, sizes = self.polygons
+        if len(ids):
+            starts = np.cumsum(sizes) - sizes
+            bounds[ids] = np.hstack([np.minimum.reduceat(points, starts),
+                                     np.maximum.reduceat(points, starts)])
+        return bounds
+
+    def take(self, ids):
+        """Shapes with the given (sorted) sequence ids, keeping ids and colors"""
+        subset = ShapeList()
+        subset.count = self.count
+        subset._colors = [(self.colors,)]
+        for kind, parts in (('rectangles', subset._rectangles), ('circles', subset._circles)):
+            kind_ids, params = getattr(self, kind)
+            rows = np.searchsorted(kind_ids, ids).clip(max=max(len(kind_ids) - 1, 0))
+            rows = rows[kind_ids[rows] == ids] if len(kind_ids) else rows[:0]
+            parts.append((kind_ids[rows], params[rows]))
+
+        kind_ids, points, sizes = self.polygons
+        if len(kind_ids):
+            rows = np.searchsorted(kind_ids, ids).clip(max=len(kind_ids) - 1)
+            rows = rows[kind_ids[rows] == ids]
+            counts = sizes[rows]
+            starts = (np.cumsum(sizes) - sizes)[rows]
+            vertices = np.arange(counts.sum()) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            subset._polygons.append((kind_ids[rows], points[vertices], counts))
+        return subset
+
+    @classmethod
+    def from_sequence(cls, sequence, scale=1.0):
+        """The R/C/T shapes of main() in sequence order, scaled to pixels"""
+        shapes = cls()
+        for x in sequence:
+            if x == 'C':
+                shapes.add_circle(*(np.array(CIRCLE) * scale), 'blue')
+            elif x == 'T':
+                shapes.add_polygon(np.array(TRIANGLE) * scale, 'green')
+            else:  # x == 'R'
+                shapes.add_rectangle(*(np.array(RECTANGLE) * scale), 'red')
+        return shapes
+
+
+def random_shapes(count, width, height, max_size=60, seed=0):
+    """Random mix of rectangles, circles and triangles for stress tests"""
+    rng = np.random.default_rng(seed)
+    kinds = rng.integers(0, 3, count)
+    shapes = ShapeList()
+    # Add in runs of equal kind so the painter order is the drawn order
+    starts = np.flatnonzero(np.diff(kinds, prepend=-1))
+    for start, stop in zip(starts, np.append(starts[1:], count)):
+        n = stop - start
+        colors = rng.random((n, 3))
+        center = rng.random((n, 2)) * (width, height)
+        size = rng.random((n, 2)) * max_size + 1
+        if kinds[start] == 0:
+            shapes.add_rectangles(np.hstack([center - size / 2, size]), colors)
+        elif kinds[start] == 1:
+            shapes.add_circles(np.hstack([center, size[:, :1] / 2]), colors)
+        else:
+            offsets = (rng.random((n, 3, 2)) - 0.5) * size[:, None]
+            shapes.add_polygons((center[:, None] + offsets).reshape(-1, 2),
+                                np.full(n, 3), colors)
+    return shapes
+
+
+def _pixel_range(low, high):
+    """First and one-past-last pixel whose center lies in [low, high)"""
+    return np.ceil(low - 0.5).astype(np.int64), np.ceil(high - 0.5).astype(np.int64)
+
+
+def _expand_rows(ids, first, last):
+    """One entry per (shape, row) for the row ranges [first, last)"""
+    counts = np.maximum(last - first, 0)
+    owners = np.repeat(np.arange(len(ids)), counts)
+    rows = np.arange(counts.sum()) + (first - (np.cumsum(counts) - counts))[owners]
+    return owners, rows
+
+
+def rectangle_spans(ids, rectangles, top, bottom):
+    """Horizontal spans (ids, rows, x_start, x_end) of rectangles"""
+    x, y, w, h = rectangles.T
+    x, w = np.minimum(x, x + w), np.abs(w)
+    y, h = np.minimum(y, y + h), np.abs(h)
+    first, last = _pixel_range(y, y + h)
+    owners, rows = _expand_rows(ids, np.maximum(first, top), np.minimum(last, bottom))
+    start, end = _pixel_range(x, x + w)
+    return ids[owners], rows, start[owners], end[owners]
+
+
+def circle_spans(ids, circles, top, bottom):
+    """Horizontal spans (ids, rows, x_start, x_end) of circles"""
+    cx, cy, r = circles.T
+    r = np.abs(r)
+    first = np.ceil(cy - r - 0.5).astype(np.int64)
+    last = np.floor(cy + r - 0.5).astype(np.int64) + 1
+    owners, rows = _expand_rows(ids, np.maximum(first, top), np.minimum(last, bottom))
+    dy = rows + 0.5 - cy[owners]
+    half = np.sqrt(np.maximum(r[owners] ** 2 - dy ** 2, 0))
+    start = np.ceil(cx[owners] - half - 0.5).astype(np.int64)
+    end = np.floor(cx[owners] + half - 0.5).astype(np.int64) + 1
+    return ids[owners], rows, start, end
+
+
+def polygon_spans(ids, points, sizes, top, bottom):
+    """Even-odd scanline spans (ids, rows, x_start, x_end) of polygons
+
+    Every edge is intersected with the pixel-center lines it crosses; the
+    crossings of one polygon row are sorted and paired into spans.
+    """
+    ends = np.cumsum(sizes)
+    following = np.arange(len(points)) + 1
+    following[ends - 1] = ends - sizes
+    a, b = points, points[following]
+    edge_ids = np.repeat(ids, sizes)
+
+    first, last = _pixel_range(np.minimum(a[:, 1], b[:, 1]), np.maximum(a[:, 1], b[:, 1]))
+    edges, rows = _expand_rows(edge_ids, np.maximum(first, top), np.minimum(last, bottom))
+    a, b = a[edges], b[edges]
+    x = a[:, 0] + (rows + 0.5 - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+
+    edge_ids = edge_ids[edges]
+    order = np.lexsort((x, (edge_ids * (bottom - top + 1)) + (rows - top)))
+    edge_ids, rows, x = edge_ids[order], rows[order], x[order]
+    start, end = _pixel_range(x[0::2], x[1::2])
+    return edge_ids[0::2], rows[0::2], start, end
+
+
+class ShapeRasterizer:
+    """Software painter's-algorithm rasterizer into an RGBA framebuffer
+
+    Shapes are turned into horizontal spans sampled at pixel centers, then
+    expanded to pixels in batches; every pixel keeps the highest sequence
+    index that covers it, which is exactly what drawing the shapes in order
+    leaves on screen. origin places the buffer's top-left pixel on the
+    canvas so the same code can render a sub-rectangle of a larger image.
+    """
+
+    batch_pixels = 1 << 22
+
+    def __init__(self, width, height, background='black', origin=(0, 0)):
+        self.width = width
+        self.height = height
+        self.origin = origin
+        self.background = to_rgba8(background, 1)[0]
+        self.ids = np.full((height, width), -1, dtype=np.int64)
+
+    def spans(self, shapes):
+        """All visible spans clipped to this buffer, in buffer coordinates"""
+        x0, y0 = self.origin
+        top, bottom = y0, y0 + self.height
+        parts = [rectangle_spans(*shapes.rectangles, top, bottom),
+                 circle_spans(*shapes.circles, top, bottom),
+                 polygon_spans(*shapes.polygons, top, bottom)]
+        ids, rows, start, end = (np.concatenate(arrays) for arrays in zip(*parts))
+        start = np.clip(start - x0, 0, self.width)
+        end = np.clip(end - x0, 0, self.width)
+        keep = end > start
+        return ids[keep], rows[keep] - y0, start[keep], end[keep]
+
+    def render(self, shapes):
+        """Rasterize shapes and return the (height, width, 4) uint8 image"""
+        self.fill(shapes)
+        return self.resolve(shapes.colors)
+
+    def fill(self, shapes):
+        """Write the sequence id of the topmost shape into every pixel"""
+        self.ids.fill(-1)
+        ids, rows, start, end = self.spans(shapes)
+        lengths = end - start
+        flat_ids = self.ids.reshape(-1)
+
+        # Expand spans to pixels in batches of about batch_pixels fragments
+        cumulative = np.cumsum(lengths)
+        bounds = np.searchsorted(cumulative, np.arange(0, cumulative[-1] if len(cumulative) else 0,
+                                                       self.batch_pixels), side='right')
+        bounds = np.append(np.unique(bounds), len(lengths))
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            n = lengths[lo:hi]
+            base = rows[lo:hi] * self.width + start[lo:hi] - (np.cumsum(n) - n)
+            pixels = np.arange(n.sum()) + np.repeat(base, n)
+            np.maximum.at(flat_ids, pixels, np.repeat(ids[lo:hi], n))
+
+    def resolve(self, colors):
+        """Map the per-pixel shape ids to colors (-1 is the background)"""
+        palette = np.vstack([colors, self.background])
+        return palette[self.ids]
+
+
+def bin_tiles(shapes, width, height, tile_size):
+    """Sequence ids of the shapes overlapping each tile, in painter order
+
+    Returns (ids, offsets): the ids of tile t are ids[offsets[t]:offsets[t + 1]],
+    tiles numbered row by row. Binning uses bounding boxes, so a tile may
+    receive shapes that end up covering none of its pixels.
+    """
+    columns = -(-width // tile_size)
+    rows = -(-height // tile_size)
+    bounds = shapes.bounds()
+    onscreen = ((bounds[:, 2] >= 0) & (bounds[:, 0] <= width) &
+                (bounds[:, 3] >= 0) & (bounds[:, 1] <= height))
+    ids = np.flatnonzero(onscreen)
+    bounds = bounds[ids]
+    tx0 = np.clip(bounds[:, 0] // tile_size, 0, columns - 1).astype(np.int64)
+    ty0 = np.clip(bounds[:, 1] // tile_size, 0, rows - 1).astype(np.int64)
+    spans_x = np.clip(bounds[:, 2] // tile_size, 0, columns - 1).astype(np.int64) - tx0 + 1
+    spans_y = np.clip(bounds[:, 3] // tile_size, 0, rows - 1).astype(np.int64) - ty0 + 1
+
+    # One (shape, tile) pair per covered tile; a stable sort by tile keeps
+    # every tile's shapes in ascending sequence order
+    counts = spans_x * spans_y
+    owners = np.repeat(np.arange(len(ids)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    tiles = (ty0[owners] + k // spans_x[owners]) * columns + tx0[owners] + k % spans_x[owners]
+    order = np.argsort(tiles, kind='stable')
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(tiles, minlength=columns * rows))])
+    return ids[owners[order]], offsets
+
+
+_tile_state = {}
+
+
+def _init_tile_worker(shapes, ids, offsets, width, height, tile_size, background, frame):
+    """Worker setup; frame is an array (threads) or a shared memory name"""
+    if isinstance(frame, str):
+        memory = shared_memory.SharedMemory(name=frame)
+        _tile_state['memory'] = memory
+        frame = np.ndarray((height, width, 4), np.uint8, buffer=memory.buf)
+    _tile_state.update(shapes=shapes, colors=shapes.colors, ids=ids, offsets=offsets,
+                       width=width, height=height, tile_size=tile_size,
+                       background=background, frame=frame)
+
+
+def _render_tile(tile):
+    """Rasterize one tile's shapes straight into the shared framebuffer"""
+    state = _tile_state
+    size = state['tile_size']
+    columns = -(-state['width'] // size)
+    x0, y0 = tile % columns * size, tile // columns * size
+    width = min(size, state['width'] - x0)
+    height = min(size, state['height'] - y0)
+    rasterizer = ShapeRasterizer(width, height, state['background'], origin=(x0, y0))
+    ids = state['ids'][state['offsets'][tile]:state['offsets'][tile + 1]]
+    rasterizer.fill(state['shapes'].take(ids))
+    state['frame'][y0:y0 + height, x0:x0 + width] = rasterizer.resolve(state['colors'])
+    return tile
+
+
+def render_tiled(shapes, width, height, background='black', tile_size=256,
+                 workers=None, threads=False):
+    """Rasterize on a pool of workers, one screen tile per task
+
+    Tiles own disjoint pixels of one framebuffer (shared memory for a
+    process pool, a plain array for threads) and keep the painter order of
+    their shapes, so the image is identical to ShapeRasterizer.render.
+    """
+    workers = workers or os.cpu_count() or 1
+    ids, offsets = bin_tiles(shapes, width, height, tile_size)
+    tiles = range(len(offsets) - 1)
+    initargs = [shapes, ids, offsets, width, height, tile_size, background]
+
+    if workers == 1 or threads:
+        frame = np.empty((height, width, 4), np.uint8)
+        _init_tile_worker(*initargs, frame)
+        if workers == 1:
+            list(map(_render_tile, tiles))
+        else:
+            with ThreadPoolExecutor(workers) as pool:
+                list(pool.map(_render_tile, tiles))
+        _tile_state.clear()
+        return frame
+
+    memory = shared_memory.SharedMemory(create=True, size=width * height * 4)
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_tile_worker,
+                                 initargs=initargs + [memory.name]) as pool:
+            chunksize = max(1, len(tiles) // (workers * 4))
+            list(pool.map(_render_tile, tiles, chunksize=chunksize))
+        return np.ndarray((height, width, 4), np.uint8, buffer=memory.buf).copy()
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def rasterize_sequence(sequence, scale=4, size=200, background='black'):
+    """Raster image of main()'s sequence drawn on a size x size canvas"""
+    pixels = int(round(size * scale))
+    shapes = ShapeList.from_sequence(sequence, scale)
+    return ShapeRasterizer(pixels, pixels, background).render(shapes)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Draw filled shapes in sequence order')
+    parser.add_argument('--sequence', default='RCT',
+                        help='shapes to draw in order: R, C and/or T (default: RCT)')
+    parser.add_argument('--raster', metavar='FILE',
+                        help='rasterize into FILE (e.g. shapes.png) without a figure')
+    parser.add_argument('--scale', type=float, default=4,
+                        help='raster pixels per drawing unit (default: 4)')
+    parser.add_argument('--random', type=int, metavar='N',
+                        help='rasterize N random shapes instead of the sequence')
+    parser.add_argument('--tiles', type=int, metavar='SIZE',
+                        help='render SIZE x SIZE pixel tiles on a worker pool')
+    parser.add_argument('--workers', type=int,
+                        help='tile workers (default: one per CPU)')
+    parser.add_argument('--threads', action='store_true',
+                        help='use a thread pool instead of processes for --tiles')
+    parser.add_argument('--width', type=int, default=1920,
+                        help='canvas width for --random (default: 1920)')
+    parser.add_argument('--height', type=int, default=1080,
+                        help='canvas height for --random (default: 1080)')
+    return parser.parse_args(argv)
+
+
+def raster_main(args):
+    """Software-rasterize the scene and write it straight to an image file"""
+    if args.random:
+        shapes = random_shapes(args.random, args.width, args.height)
+        width, height = args.width, args.height
+    else:
+        shapes = ShapeList.from_sequence(args.sequence, args.scale)
+        width = height = int(round(200 * args.scale))
+
+    start = time.perf_counter()
+    if args.tiles:
+        image = render_tiled(shapes, width, height, tile_size=args.tiles,
+                             workers=args.workers, threads=args.threads)
+    else:
+        image = ShapeRasterizer(width, height).render(shapes)
+    elapsed = time.perf_counter() - start
+    plt.imsave(args.raster, image)
+    print(f"Rasterized {len(shapes)} shapes at {width}x{height} in "
+          f"{elapsed * 1000:.1f} ms -> {args.raster}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.raster:
+        raster_main(args)
+        return
+
     # Set up the plot to mimic graphics.h behavior
     fig, ax = plt.subplots(figsize=(10, 8))
     ax.set_facecolor('black')
@@ -42,7 +493,7 @@ def main():
     ax.axis('off')  # Remove axes for cleaner look
 
     # Drawing sequence (same as C++ code)
-    sequence = "RCT"  # Rectangle, Circle, Triangle
+    sequence = args.sequence  # "RCT": Rectangle, Circle, Triangle
 
     print(f"Drawing shapes in sequence: {sequence}")
 
@@ -88,7 +539,17 @@ Key Features:
 The shapes are drawn with both fill and border in the same color,
 equivalent to the setfillstyle(SOLID_FILL) and floodfill() functions in C++.
 
+Raster Backend:
+ShapeRasterizer fills the same shapes into an RGBA NumPy framebuffer with
+vectorized scanline spans (pixel centers, even-odd rule for polygons) and
+keeps the sequence order per pixel, so large scenes become images without
+a matplotlib figure. render_tiled bins the shapes into screen tiles by
+bounding box and fills the tiles in parallel into one shared framebuffer.
+
 To run: python3 filled_shapes.py
+To rasterize: python3 1_Visual_surface_detection.py --raster shapes.png --sequence RCT
+Stress test:  python3 1_Visual_surface_detection.py --raster scene.png --random 50000
+Tiled:        python3 1_Visual_surface_detection.py --raster scene.png --random 500000 --tiles 256
 
 Try changing the sequence string to draw shapes in different orders!
 Examples: "TCR", "CCT", "RRR", etc.
@@ -0,0 +1,239 @@
+import os
+os.environ.setdefault('MPLBACKEND', 'Agg')  # Headless: never open a window
+
+import argparse
+import importlib
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import matplotlib.pyplot as plt
+import numpy as np
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+hss = importlib.import_module('1_hidden_surface_simulation')
+
+
+def synthetic_mesh(faces, seed=0):
+    """Bumpy triangulated sphere with roughly the requested number of faces"""
+    rng = np.random.default_rng(seed)
+    rows = max(2, int(np.sqrt(faces / 4)))
+    cols = max(3, int(round(faces / (2 * rows))))
+
+    theta = np.linspace(0.05, np.pi - 0.05, rows + 1)
+    phi = np.linspace(0, 2 * np.pi, cols, endpoint=False)
+    t, p = np.meshgrid(theta, phi, indexing='ij')
+    radius = 2 + 0.1 * rng.standard_normal(t.shape)
+    vertices = np.stack([radius * np.sin(t) * np.cos(p),
+                         radius * np.sin(t) * np.sin(p),
+                         radius * np.cos(t)], axis=-1).reshape(-1, 3)
+
+    grid = np.arange((rows + 1) * cols).reshape(rows + 1, cols)
+    a, b = grid[:-1], grid[1:]
+    c, d = np.roll(b, -1, axis=1), np.roll(a, -1, axis=1)
+    triangles = np.concatenate([np.stack([a, b, c], axis=-1).reshape(-1, 3),
+                                np.stack([a, c, d], axis=-1).reshape(-1, 3)])
+    colors = rng.random((len(triangles), 4))
+    colors[:, 3] = 1
+    return vertices, triangles, colors
+
+
+def summarize(samples):
+    """Median, p95 and count of timings in milliseconds"""
+    if not samples:
+        return None
+    ms = np.array(samples) * 1000
+    return {
+        'median_ms': float(np.median(ms)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'samples': len(ms)
+    }
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def peak_memory(func, *args):
+    """Peak traced allocation of one call in MB (run apart from timing)"""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def bench_size(faces, angles, width, height, per_face_limit, repeats, seed):
+    """Time every pipeline stage for one synthetic mesh size"""
+    vertices, triangles, colors = synthetic_mesh(faces, seed)
+    corners = vertices[triangles]
+    samples = {stage: [] for stage in ('calculate_normal', 'add_surface', 'mesh_build',
+                                       'back_face_culling', 'z_buffer_sort', 'draw',
+                                       'cull_back_faces', 'depth_order', 'zbuffer_render')}
+
+    # Per-face Python paths and the matplotlib draw are only timed up to
+    # per_face_limit faces
+    per_face = len(triangles) <= per_face_limit
+    if per_face:
+        sim = hss.HiddenSurfaceSimulation()
+        for face in corners:
+            elapsed, _ = timed(sim.calculate_normal, face)
+            samples['calculate_normal'].append(elapsed)
+
+        def add_all():
+            sim = hss.HiddenSurfaceSimulation()
+            for face in corners:
+                sim.add_surface(face)
+            return sim.mesh.normals
+
+        # Faces are flushed to the mesh in bulk, so one sample is the
+        # amortized per-face cost of a whole run
+        for _ in range(repeats):
+            elapsed, _ = timed(add_all)
+            samples['add_surface'].append(elapsed / len(triangles))
+
+    def build():
+        return hss.SurfaceMesh(vertices, triangles, colors)
+
+    for _ in range(repeats):
+        elapsed, mesh = timed(build)
+        samples['mesh_build'].append(elapsed)
+
+    sim = hss.HiddenSurfaceSimulation(mesh)
+    renderer = hss.ZBufferRenderer(width, height)
+    if per_face:
+        sim.surfaces  # Build the per-face dict view once, outside the timings
+        fig = plt.figure(figsize=(width / 100, height / 100), dpi=100)
+        ax = fig.add_subplot(111, projection='3d')
+        hss.style_axes(ax, 3)
+        collection = Poly3DCollection(corners[:0], edgecolor='black', linewidth=0.5)
+        ax.add_collection3d(collection)
+
+    for angle in np.linspace(0, 2 * np.pi, angles, endpoint=False):
+        camera_pos = sim.get_camera_position(angle)
+        camera = hss.Camera(camera_pos, aspect=width / height)
+
+        elapsed, mask = timed(sim.cull_back_faces, camera_pos)
+        samples['cull_back_faces'].append(elapsed)
+        visible = np.flatnonzero(mask)
+
+        elapsed, order = timed(sim.depth_order, camera_pos, visible)
+        samples['depth_order'].append(elapsed)
+
+        elapsed, _ = timed(renderer.render, mesh, camera, order)
+        samples['zbuffer_render'].append(elapsed)
+
+        if per_face:
+            elapsed, _ = timed(sim.back_face_culling, camera_pos)
+            samples['back_face_culling'].append(elapsed)
+
+            elapsed, _ = timed(sim.z_buffer_sort, camera_pos)
+            samples['z_buffer_sort'].append(elapsed)
+
+            collection.set_verts(corners[order])
+            collection.set_facecolor(colors[order])
+            elapsed, _ = timed(fig.canvas.draw)
+            samples['draw'].append(elapsed)
+
+    if per_face:
+        plt.close(fig)
+
+    camera_pos = sim.get_camera_position(0.0)
+    camera = hss.Camera(camera_pos, aspect=width / height)
+    visible = np.flatnonzero(sim.cull_back_faces(camera_pos))
+    memory = {
+        'mesh_build': peak_memory(build),
+        'cull_back_faces': peak_memory(sim.cull_back_faces, camera_pos),
+        'depth_order': peak_memory(sim.depth_order, camera_pos, visible),
+        'zbuffer_render': peak_memory(renderer.render, mesh, camera, visible)
+    }
+
+    return {
+        'faces': int(len(triangles)),
+        'stages': {stage: summarize(times) for stage, times in samples.items()},
+        'peak_memory_mb': memory
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark the hidden surface pipeline stage by stage')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6],
+                        help='approximate face counts of the synthetic meshes')
+    parser.add_argument('--angles', type=int, default=36,
+                        help='camera angles sampled around the orbit (default: 36)')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--per-face-limit', type=int, default=10 ** 4,
+                        help='largest mesh timed through the per-face Python '
+                             'paths and the matplotlib draw')
+    parser.add_argument('--repeats', type=int, default=7,
+                        help='runs of the whole-mesh stages add_surface and '
+                             'mesh_build (default: 7)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', metavar='FILE',
+                        help='write JSON here instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    for faces in args.sizes:
+        print(f"Benchmarking ~{faces} faces...", file=sys.stderr)
+        results.append(bench_size(faces, args.angles, args.width, args.height,
+                                  args.per_face_limit, args.repeats, args.seed))
+
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'angles': args.angles,
+        'resolution': [args.width, args.height],
+        'results': results
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
+
+"""
+Hidden Surface Pipeline Benchmark
+
+Generates synthetic bumpy-sphere meshes (10^2 to 10^6 faces by default) and
+times each stage of 1_hidden_surface_simulation.py over many camera angles:
+
+- calculate_normal: the per-face normal, one sample per face
+- add_surface: a whole mesh added face by face, one sample per run
+  (--repeats) holding the mean time per face including the bulk flush
+- mesh_build: bulk SurfaceMesh construction (normals and centers), one
+  sample per run
+- back_face_culling / z_buffer_sort: the per-face dict methods used by
+  the matplotlib animations
+- draw: a full matplotlib (Agg) redraw of the sorted visible faces
+- cull_back_faces: the batched back-face test
+- depth_order: far-to-near ordering of the visible face indices
+- zbuffer_render: ZBufferRenderer rasterization at the given resolution
+
+The per-face stages and draw only run up to --per-face-limit faces and
+are null above it.
+
+Each stage reports median and p95 milliseconds; peak traced memory is
+measured in a separate pass so tracing does not skew the timings. Runs
+headless with the Agg backend.
+
+To run: python3 1_hidden_surface_benchmark.py --output bench.json
+"""
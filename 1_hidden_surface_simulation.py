@@ -1,28 +1,233 @@
 import matplotlib.pyplot as plt
+from matplotlib import colors as mcolors
 from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import matplotlib.animation as animation
+import matplotlib.image as mpimg
+import argparse
+import csv
+import io
+import json
+import numbers
+import os
+import re
+import struct
+import sys
 import time
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+
+def compute_face_normals(vertices, faces):
+    """Calculate unit normals for every face in one batched cross product"""
+    v0 = vertices[faces[:, 0]]
+    normals = np.cross(vertices[faces[:, 1]] - v0, vertices[faces[:, 2]] - v0)
+    norms = np.linalg.norm(normals, axis=1)
+    nonzero = norms != 0
+    normals[nonzero] /= norms[nonzero, None]
+    return normals
+
+
+def compute_face_centers(vertices, faces, sizes=None):
+    """Calculate face centroids, ignoring the padding of short faces"""
+    if sizes is None or np.all(sizes == faces.shape[1]):
+        return vertices[faces].mean(axis=1)
+    valid = np.arange(faces.shape[1]) < sizes[:, None]
+    total = (vertices[faces] * valid[:, :, None]).sum(axis=1)
+    return total / sizes[:, None]
+
+
+class SurfaceMesh:
+    """Struct-of-arrays face store: contiguous vertex, index, normal and center arrays
+
+    Faces live in an (F, k) index array. Faces with fewer than k vertices
+    are padded by repeating their last index, which leaves the polygon
+    unchanged. Faces added one at a time are queued and merged in bulk the
+    next time an array is read.
+    """
+
+    def __init__(self, vertices=None, faces=None, colors='blue', names=None):
+        self._vertices = np.zeros((0, 3))
+        self._faces = np.zeros((0, 3), dtype=np.int64)
+        self._sizes = np.zeros(0, dtype=np.int64)
+        self._normals = np.zeros((0, 3))
+        self._centers = np.zeros((0, 3))
+        self._colors = np.zeros((0, 4))
+        self._names = []
+        self._color_specs = []
+        self._pending = []
+        self.version = 0
+
+        if vertices is not None and faces is not None:
+            self.extend(vertices, faces, colors, names)
+
+    def __len__(self):
+        return len(self._faces) + len(self._pending)
+
+    @property
+    def vertices(self):
+        self._flush()
+        return self._vertices
+
+    @property
+    def faces(self):
+        self._flush()
+        return self._faces
+
+    @property
+    def sizes(self):
+        self._flush()
+        return self._sizes
+
+    @property
+    def normals(self):
+        self._flush()
+        return self._normals
+
+    @property
+    def centers(self):
+        self._flush()
+        return self._centers
+
+    @property
+    def colors(self):
+        self._flush()
+        return self._colors
+
+    @property
+    def names(self):
+        self._flush()
+        return self._names
+
+    def add_face(self, vertices, color='blue', name='Surface'):
+        """Queue a single polygon; arrays are rebuilt lazily"""
+        self._pending.append((np.asarray(vertices, dtype=float), color, name))
+        self.version += 1
+
+    def extend(self, vertices, faces, colors='blue', names=None):
+        """Append a block of faces that index into a block of vertices"""
+        self._flush()
+        vertices = np.ascontiguousarray(vertices, dtype=float).reshape(-1, 3)
+        faces = np.ascontiguousarray(faces, dtype=np.int64)
+        sizes = np.full(len(faces), faces.shape[1], dtype=np.int64)
+        colors = self._to_rgba(colors, len(faces))
+        names = [None] * len(faces) if names is None else list(names)
+        self._append(vertices, faces, sizes, colors, names, [None] * len(faces))
+
+    def normalize(self, extent=2.0):
+        """Center the mesh on the origin and scale it to fit in +/- extent"""
+        vertices = self.vertices
+        if len(vertices) == 0:
+            return
+        low, high = vertices.min(axis=0), vertices.max(axis=0)
+        middle = (low + high) / 2
+        half = (high - low).max() / 2
+        scale = extent / half if half > 0 else 1.0
+        self._vertices = (vertices - middle) * scale
+        self._centers = (self._centers - middle) * scale
+        self.version += 1
+
+    def face_name(self, index):
+        """Return the face name, generating one for unnamed bulk faces"""
+        name = self.names[index]
+        return f'Surface {index}' if name is None else name
+
+    def face_color(self, index):
+        """Return the color as given to add_face, or the RGBA tuple for bulk faces"""
+        self._flush()
+        spec = self._color_specs[index]
+        return tuple(self._colors[index]) if spec is None else spec
+
+    def face_vertices(self, index):
+        """Return the (unpadded) vertices of one face"""
+        face = self.faces[index, :self.sizes[index]]
+        return self._vertices[face]
+
+    def _to_rgba(self, colors, count):
+        if isinstance(colors, np.ndarray) and colors.ndim == 2:
+            return colors.astype(float)
+        # A 3 or 4 element list of numbers is one RGB(A) color, not per-face colors
+        if isinstance(colors, (list, tuple)) and len(colors) == count \
+                and not (count in (3, 4) and isinstance(colors[0], numbers.Real)):
+            return mcolors.to_rgba_array(colors)
+        return np.tile(mcolors.to_rgba(colors), (count, 1))
+
+    def _append(self, vertices, faces, sizes, colors, names, color_specs):
+        width = max(self._faces.shape[1], faces.shape[1])
+        old_faces = self._pad(self._faces, width)
+        faces = self._pad(faces, width) + len(self._vertices)
+
+        self._faces = np.concatenate([old_faces, faces])
+        self._vertices = np.concatenate([self._vertices, vertices])
+        self._sizes = np.concatenate([self._sizes, sizes])
+        self._normals = np.concatenate(
+            [self._normals, compute_face_normals(self._vertices, faces)])
+        self._centers = np.concatenate(
+            [self._centers, compute_face_centers(self._vertices, faces, sizes)])
+        self._colors = np.concatenate([self._colors, colors])
+        self._names.extend(names)
+        self._color_specs.extend(color_specs)
+        self.version += 1
+
+    @staticmethod
+    def _pad(faces, width):
+        if faces.shape[1] >= width:
+            return faces
+        padding = np.repeat(faces[:, -1:], width - faces.shape[1], axis=1)
+        return np.concatenate([faces, padding], axis=1)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+
+        sizes = np.array([len(v) for v, _, _ in pending], dtype=np.int64)
+        width = sizes.max()
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        columns = np.minimum(np.arange(width), sizes[:, None] - 1)
+        faces = starts[:, None] + columns
+
+        vertices = np.concatenate([v for v, _, _ in pending])
+        colors = mcolors.to_rgba_array([c for _, c, _ in pending])
+        names = [n for _, _, n in pending]
+        self._append(vertices, faces, sizes, colors, names, [c for _, c, _ in pending])
 
 
 class HiddenSurfaceSimulation:
-    def __init__(self):
-        self.surfaces = []
+    def __init__(self, mesh=None):
+        self.mesh = mesh if mesh is not None else SurfaceMesh()
         self.visible_surfaces = []
+        self.visible_mask = np.zeros(0, dtype=bool)
         self.angle = 0
+        self.bvh = None
+        self.orbit = None
+        self.hiz = None
+        self.stage_counts = {}
+        self.culled_counts = {}
+        self._surface_cache = ([], -1)
+
+    @property
+    def surfaces(self):
+        """Per-face dict view over the mesh arrays (kept for existing callers)"""
+        cached, version = self._surface_cache
+        if version != self.mesh.version:
+            mesh = self.mesh
+            cached = [{
+                'index': i,
+                'vertices': mesh.face_vertices(i),
+                'color': mesh.face_color(i),
+                'name': mesh.face_name(i),
+                'normal': mesh.normals[i],
+                'center': mesh.centers[i]
+            } for i in range(len(mesh))]
+            self._surface_cache = (cached, mesh.version)
+        return cached
 
     def add_surface(self, vertices, color='blue', name='Surface'):
         """Add a surface defined by vertices"""
-        vertices_array = np.array(vertices)
-        surface = {
-            'vertices': vertices_array,
-            'color': color,
-            'name': name,
-            'normal': self.calculate_normal(vertices),
-            'center': np.mean(vertices_array, axis=0)
-        }
-        self.surfaces.append(surface)
+        self.mesh.add_face(vertices, color, name)
 
     def calculate_normal(self, vertices):
         """Calculate surface normal using cross product"""
@@ -42,32 +247,133 @@ class HiddenSurfaceSimulation:
         z = 6
         return np.array([x, y, z])
 
-    def back_face_culling(self, view_point):
-        """Remove back-facing surfaces"""
-        visible = []
-        culled = []
+    def cull_back_faces(self, view_point, threshold=0.1, indices=None):
+        """Classify faces in one batched pass; returns a boolean visibility mask
 
-        for surface in self.surfaces:
-            view_vector = view_point - surface['center']
-            view_vector = view_vector / np.linalg.norm(view_vector)
-            dot_product = np.dot(surface['normal'], view_vector)
+        When indices is given only those faces are tested and the mask is
+        aligned with indices.
+        """
+        normals = self.mesh.normals
+        centers = self.mesh.centers
+        if indices is not None:
+            normals = normals[indices]
+            centers = centers[indices]
 
-            if dot_product > 0.1:  # Small threshold for stability
-                visible.append(surface)
-            else:
-                culled.append(surface)
+        view_vectors = np.asarray(view_point, dtype=float) - centers
+        dots = np.einsum('ij,ij->i', normals, view_vectors)
+        distances = np.sqrt(np.einsum('ij,ij->i', view_vectors, view_vectors))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return dots > threshold * distances
+
+    def depth_order(self, view_point, indices):
+        """Return face indices sorted far-to-near from the view point"""
+        offsets = self.mesh.centers[indices] - np.asarray(view_point, dtype=float)
+        distances = np.einsum('ij,ij->i', offsets, offsets)
+        return indices[np.argsort(-distances, kind='stable')]
+
+    def back_face_culling(self, view_point):
+        """Remove back-facing surfaces"""
+        mask = self.cull_back_faces(view_point)
+        surfaces = self.surfaces
+        visible = [surfaces[i] for i in np.flatnonzero(mask)]
+        culled = [surfaces[i] for i in np.flatnonzero(~mask)]
 
+        self.visible_mask = mask
         self.visible_surfaces = visible
         return visible, culled
 
     def z_buffer_sort(self, view_point):
         """Sort surfaces by distance from viewer"""
-        for surface in self.visible_surfaces:
-            distance = np.linalg.norm(view_point - surface['center'])
+        if not self.visible_surfaces:
+            return
+        indices = np.array([s['index'] for s in self.visible_surfaces])
+        offsets = self.mesh.centers[indices] - np.asarray(view_point, dtype=float)
+        distances = np.sqrt(np.einsum('ij,ij->i', offsets, offsets))
+        for surface, distance in zip(self.visible_surfaces, distances):
             surface['distance'] = distance
 
         self.visible_surfaces.sort(key=lambda x: x['distance'], reverse=True)
 
+    def z_buffer_render(self, view_point, width=640, height=480, renderer=None,
+                        angle=None):
+        """Rasterize the front-facing surfaces into a per-pixel depth buffer"""
+        if renderer is None:
+            renderer = ZBufferRenderer(width, height)
+        camera = Camera(view_point, aspect=renderer.width / renderer.height)
+        return renderer.render(self.mesh, camera, self.cull(camera, angle=angle))
+
+    def build_bvh(self, leaf_size=128):
+        """Build (or rebuild) the bounding-volume hierarchy over the faces"""
+        self.bvh = SurfaceBVH(self.mesh, leaf_size)
+        return self.bvh
+
+    def precompute_orbit(self, radius=8, height=6, threshold=0.1):
+        """Solve back-face visibility for every angle of the camera orbit"""
+        self.orbit = OrbitVisibility(self.mesh, radius, height, threshold)
+        return self.orbit
+
+    def _orbit_mask(self, angle, threshold=0.1):
+        orbit = self.orbit
+        if orbit is None or orbit.version != self.mesh.version \
+                or orbit.threshold != threshold:
+            orbit = self.precompute_orbit(threshold=threshold)
+        return orbit.visible_at(angle)
+
+    def orbit_culling(self, angle):
+        """back_face_culling for the orbit camera, answered from the orbit cache"""
+        mask = self._orbit_mask(angle)
+        surfaces = self.surfaces
+        visible = [surfaces[i] for i in np.flatnonzero(mask)]
+        culled = [surfaces[i] for i in np.flatnonzero(~mask)]
+
+        self.visible_mask = mask
+        self.visible_surfaces = visible
+        return visible, culled
+
+    def enable_occlusion_culling(self, width=64, height=64, occluders=128):
+        """Add a hierarchical-Z occlusion stage after back-face culling"""
+        self.hiz = HierarchicalZBuffer(width, height, occluders)
+        return self.hiz
+
+    def cull(self, camera, threshold=0.1, angle=None):
+        """Frustum-cull through the BVH, then back-face test the survivors
+
+        Returns the visible face indices. When angle is given, camera.eye
+        must be get_camera_position(angle) and the back-face stage is read
+        from the orbit cache. If occlusion culling is enabled, faces hidden
+        behind the largest occluders are dropped last. self.stage_counts
+        records how many faces remain after each stage and
+        self.culled_counts how many each stage removed.
+        """
+        bvh = self.bvh
+        if bvh is None or bvh.version != self.mesh.version:
+            bvh = self.build_bvh()
+
+        candidates = bvh.frustum_cull(camera.frustum_planes())
+        if angle is not None:
+            mask = self._orbit_mask(angle, threshold)
+            visible = candidates[mask[candidates]]
+        elif len(candidates) == len(self.mesh):
+            visible = np.flatnonzero(self.cull_back_faces(camera.eye, threshold))
+        else:
+            visible = candidates[self.cull_back_faces(camera.eye, threshold, candidates)]
+        front_facing = len(visible)
+        if self.hiz is not None:
+            visible = self.hiz.cull(self.mesh, camera, visible)
+
+        self.stage_counts = {
+            'input': len(self.mesh),
+            'frustum': len(candidates),
+            'back_face': front_facing,
+            'occlusion': len(visible)
+        }
+        self.culled_counts = {
+            'frustum': len(self.mesh) - len(candidates),
+            'back_face': len(candidates) - front_facing,
+            'occlusion': front_facing - len(visible)
+        }
+        return visible
+
 
 class CubeSimulation(HiddenSurfaceSimulation):
     def __init__(self):
@@ -98,17 +404,971 @@ class CubeSimulation(HiddenSurfaceSimulation):
             self.add_surface(face_vertices, color, name)
 
 
-def animate_hidden_surface_elimination():
-    """Main animation function"""
-    # Create simulation
-    sim = CubeSimulation()
+PLY_TYPES = {
+    'char': 'i1', 'int8': 'i1', 'uchar': 'u1', 'uint8': 'u1',
+    'short': 'i2', 'int16': 'i2', 'ushort': 'u2', 'uint16': 'u2',
+    'int': 'i4', 'int32': 'i4', 'uint': 'u4', 'uint32': 'u4',
+    'float': 'f4', 'float32': 'f4', 'double': 'f8', 'float64': 'f8'
+}
 
-    # Set up the figure and 3D axis
-    fig = plt.figure(figsize=(15, 10))
-    ax = fig.add_subplot(111, projection='3d')
 
-    # Style the plot
-    fig.patch.set_facecolor('white')
+def fan_triangulate(polygons):
+    """Split (n, k) polygons into (n * (k - 2), 3) fan triangles"""
+    k = polygons.shape[1]
+    if k == 3:
+        return polygons
+    fans = np.arange(1, k - 1)
+    triangles = np.empty((len(polygons), k - 2, 3), dtype=polygons.dtype)
+    triangles[:, :, 0] = polygons[:, :1]
+    triangles[:, :, 1] = polygons[:, fans]
+    triangles[:, :, 2] = polygons[:, fans + 1]
+    return triangles.reshape(-1, 3)
+
+
+def _triangulate_rows(rows):
+    """Fan-triangulate ragged index rows, keeping the original face order"""
+    groups = {}
+    for position, row in enumerate(rows):
+        groups.setdefault(len(row), ([], []))
+        groups[len(row)][0].append(position)
+        groups[len(row)][1].append(row)
+
+    parts, order = [], []
+    for k, (positions, group) in groups.items():
+        if k < 3:
+            continue
+        parts.append(fan_triangulate(np.array(group, dtype=np.int64)))
+        order.append(np.repeat(positions, k - 2))
+    if not parts:
+        return np.zeros((0, 3), dtype=np.int64)
+    order = np.argsort(np.concatenate(order), kind='stable')
+    return np.concatenate(parts)[order]
+
+
+def _parse_index_rows(lines, first, count_column=None):
+    """Parse face index lines with the C text parser, or row by row if ragged
+
+    first is the column of the first index; count_column, when given, holds
+    each row's index count (PLY style).
+    """
+    if count_column is None:
+        arity = len(lines[0].split()) - first
+    else:
+        arity = int(lines[0].split()[count_column])
+    try:
+        records = np.loadtxt(lines, dtype=np.int64, ndmin=2)
+        if count_column is None or np.all(records[:, count_column] == arity):
+            return fan_triangulate(records[:, first:first + arity])
+    except ValueError:
+        pass
+
+    rows = []
+    for line in lines:
+        words = line.split()
+        n = len(words) - first if count_column is None else int(words[count_column])
+        rows.append([int(w) for w in words[first:first + n]])
+    return _triangulate_rows(rows)
+
+
+def load_obj(path, chunk_lines=1 << 16):
+    """Stream an OBJ file in chunks of lines; returns (vertices, triangles)
+
+    Texture/normal references (v/vt/vn) and negative (relative) indices are
+    supported; polygons are fan-triangulated.
+    """
+    vertex_chunks = []
+    face_chunks = []
+    vertex_count = 0
+    with open(path, 'r') as f:
+        for chunk in iter(lambda: list(islice(f, chunk_lines)), []):
+            vertex_lines = [line for line in chunk if line.startswith('v ')]
+            face_lines = [line for line in chunk if line.startswith('f ')]
+
+            if face_lines:
+                text = ''.join(face_lines).replace('f ', '  ')
+                if '/' in text:
+                    text = re.sub(r'/\S*', '', text)
+                if '-' in text:
+                    rows = [line.split() for line in text.splitlines()]
+                    faces = _triangulate_rows(
+                        _resolve_relative(chunk, rows, vertex_count))
+                else:
+                    faces = _parse_index_rows(text.splitlines(), 0)
+                face_chunks.append(faces - 1)
+
+            if vertex_lines:
+                block = np.loadtxt(vertex_lines, usecols=(1, 2, 3), ndmin=2)
+                vertex_chunks.append(block)
+                vertex_count += len(block)
+
+    vertices = np.concatenate(vertex_chunks) if vertex_chunks else np.zeros((0, 3))
+    faces = np.concatenate(face_chunks) if face_chunks else np.zeros((0, 3), dtype=np.int64)
+    return vertices, faces
+
+
+def _resolve_relative(chunk, rows, vertex_count):
+    """Turn negative OBJ indices into absolute 1-based ones"""
+    resolved = []
+    rows = iter(rows)
+    for line in chunk:
+        if line.startswith('v '):
+            vertex_count += 1
+        elif line.startswith('f '):
+            row = [int(i) for i in next(rows)]
+            resolved.append([i + vertex_count + 1 if i < 0 else i for i in row])
+    return resolved
+
+
+def _read_ply_header(f):
+    """Parse a PLY header; returns (format, elements)"""
+    if f.readline().strip() != b'ply':
+        raise ValueError('not a PLY file')
+    fmt = None
+    elements = []
+    for line in f:
+        words = line.decode('ascii').split()
+        if not words or words[0] in ('comment', 'obj_info'):
+            continue
+        if words[0] == 'format':
+            fmt = words[1]
+        elif words[0] == 'element':
+            elements.append((words[1], int(words[2]), []))
+        elif words[0] == 'property':
+            if words[1] == 'list':
+                elements[-1][2].append(('list', PLY_TYPES[words[2]],
+                                        PLY_TYPES[words[3]], words[4]))
+            else:
+                elements[-1][2].append(('scalar', PLY_TYPES[words[1]], words[2]))
+        elif words[0] == 'end_header':
+            return fmt, elements
+    raise ValueError('PLY header has no end_header')
+
+
+def load_ply(path, chunk_rows=1 << 16):
+    """Load an ASCII or binary PLY file; returns (vertices, triangles)
+
+    Binary files are memory-mapped and read through structured dtypes, so
+    records are never parsed into Python objects. Face lists with a single
+    arity take that path; mixed-arity binary faces fall back to a record walk.
+    """
+    with open(path, 'rb') as f:
+        fmt, elements = _read_ply_header(f)
+        offset = f.tell()
+
+    if fmt == 'ascii':
+        return _load_ply_ascii(path, elements, offset, chunk_rows)
+    if fmt not in ('binary_little_endian', 'binary_big_endian'):
+        raise ValueError(f'unsupported PLY format: {fmt}')
+    endian = '<' if fmt == 'binary_little_endian' else '>'
+
+    vertices = faces = None
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+    for name, count, props in elements:
+        if all(p[0] == 'scalar' for p in props):
+            dtype = np.dtype([(p[2], endian + p[1]) for p in props])
+            records = np.ndarray((count,), dtype, buffer=data, offset=offset)
+            if name == 'vertex':
+                vertices = np.stack([records['x'], records['y'], records['z']],
+                                    axis=1).astype(float)
+            offset += count * dtype.itemsize
+        elif name == 'face':
+            faces, offset = _read_ply_binary_faces(data, offset, count, props, endian)
+        else:
+            raise ValueError(f'unsupported list property in PLY element {name!r}')
+        if vertices is not None and faces is not None:
+            break
+
+    if faces is None:
+        faces = np.zeros((0, 3), dtype=np.int64)
+    return vertices, faces
+
+
+def _read_ply_binary_faces(data, offset, count, props, endian):
+    """Read the vertex index list of a binary face element"""
+    list_props = [p for p in props if p[0] == 'list']
+    if len(list_props) != 1 or count == 0:
+        raise ValueError('PLY face element must have exactly one list property')
+
+    # Try the fixed-arity layout suggested by the first record
+    fields = []
+    arity = None
+    position = offset
+    for prop in props:
+        if prop[0] == 'scalar':
+            fields.append((prop[2], endian + prop[1]))
+            if arity is None:
+                position += np.dtype(prop[1]).itemsize
+        else:
+            count_type = endian + prop[1]
+            arity = int(np.ndarray((1,), count_type, buffer=data, offset=position)[0])
+            fields.append(('count', count_type))
+            fields.append(('indices', endian + prop[2], (arity,)))
+    dtype = np.dtype(fields)
+
+    if offset + count * dtype.itemsize <= len(data):
+        records = np.ndarray((count,), dtype, buffer=data, offset=offset)
+        if np.all(records['count'] == arity):
+            faces = fan_triangulate(records['indices'].astype(np.int64))
+            return faces, offset + count * dtype.itemsize
+
+    return _walk_ply_binary_faces(data, offset, count, props, endian)
+
+
+def _walk_ply_binary_faces(data, offset, count, props, endian):
+    """Slow path for mixed-arity binary faces: walk records one by one"""
+    buffer = memoryview(data)
+    rows = []
+    for _ in range(count):
+        for prop in props:
+            if prop[0] == 'scalar':
+                offset += np.dtype(prop[1]).itemsize
+                continue
+            count_format = endian + np.dtype(prop[1]).char
+            item_format = endian + np.dtype(prop[2]).char
+            n = struct.unpack_from(count_format, buffer, offset)[0]
+            offset += struct.calcsize(count_format)
+            rows.append(struct.unpack_from(f'{endian}{n}{np.dtype(prop[2]).char}',
+                                           buffer, offset))
+            offset += n * struct.calcsize(item_format)
+    return _triangulate_rows(rows), offset
+
+
+def _load_ply_ascii(path, elements, offset, chunk_rows):
+    vertices = faces = None
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for name, count, props in elements:
+            remaining = count
+            blocks = []
+            while remaining:
+                lines = list(islice(f, min(chunk_rows, remaining)))
+                if not lines:
+                    raise ValueError(f'PLY element {name!r} is truncated')
+                remaining -= len(lines)
+                if name == 'vertex':
+                    columns = [i for i, p in enumerate(props) if p[2] in ('x', 'y', 'z')]
+                    blocks.append(np.loadtxt(lines, usecols=columns, ndmin=2))
+                elif name == 'face':
+                    list_index = next(i for i, p in enumerate(props) if p[0] == 'list')
+                    blocks.append(_parse_index_rows(lines, list_index + 1, list_index))
+            if name == 'vertex':
+                vertices = np.concatenate(blocks) if blocks else np.zeros((0, 3))
+            elif name == 'face':
+                faces = np.concatenate(blocks) if blocks else np.zeros((0, 3), dtype=np.int64)
+
+    if faces is None:
+        faces = np.zeros((0, 3), dtype=np.int64)
+    return vertices, faces
+
+
+def load_mesh(path, color='steelblue', normalize=True):
+    """Load an OBJ or PLY file into a SurfaceMesh with bulk normals/centers"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.obj':
+        vertices, faces = load_obj(path)
+    elif extension == '.ply':
+        vertices, faces = load_ply(path)
+    else:
+        raise ValueError(f'unsupported mesh format: {extension}')
+
+    mesh = SurfaceMesh(vertices, faces, colors=color)
+    if normalize:
+        mesh.normalize()
+    return mesh
+
+
+class MeshSimulation(HiddenSurfaceSimulation):
+    def __init__(self, path, color='steelblue'):
+        super().__init__(load_mesh(path, color))
+
+
+class Camera:
+    """Perspective camera looking from eye towards target"""
+
+    def __init__(self, eye, target=(0, 0, 0), up=(0, 0, 1), fov=45,
+                 aspect=1.0, near=0.1, far=100.0):
+        self.eye = np.asarray(eye, dtype=float)
+        self.target = np.asarray(target, dtype=float)
+        self.up = np.asarray(up, dtype=float)
+        self.fov = fov
+        self.aspect = aspect
+        self.near = near
+        self.far = far
+
+    def view_matrix(self):
+        """World-to-camera look-at matrix"""
+        forward = self.target - self.eye
+        forward /= np.linalg.norm(forward)
+        right = np.cross(forward, self.up)
+        right /= np.linalg.norm(right)
+        true_up = np.cross(right, forward)
+
+        view = np.eye(4)
+        view[0, :3] = right
+        view[1, :3] = true_up
+        view[2, :3] = -forward
+        view[:3, 3] = -view[:3, :3] @ self.eye
+        return view
+
+    def projection_matrix(self):
+        """OpenGL-style perspective projection matrix"""
+        f = 1.0 / np.tan(np.radians(self.fov) / 2)
+        near, far = self.near, self.far
+        projection = np.zeros((4, 4))
+        projection[0, 0] = f / self.aspect
+        projection[1, 1] = f
+        projection[2, 2] = (far + near) / (near - far)
+        projection[2, 3] = 2 * far * near / (near - far)
+        projection[3, 2] = -1
+        return projection
+
+    def view_projection(self):
+        return self.projection_matrix() @ self.view_matrix()
+
+    def frustum_planes(self):
+        """Six (a, b, c, d) planes with a*x + b*y + c*z + d >= 0 inside"""
+        m = self.view_projection()
+        planes = np.array([m[3] + m[0], m[3] - m[0],
+                           m[3] + m[1], m[3] - m[1],
+                           m[3] + m[2], m[3] - m[2]])
+        return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+    def project(self, points, width, height):
+        """Project world points to pixel coordinates and NDC depth
+
+        Returns (xy, depth, valid) where valid is False for points at or
+        behind the near plane.
+        """
+        points = np.asarray(points, dtype=float)
+        matrix = self.view_projection()
+        clip = points @ matrix[:, :3].T + matrix[:, 3]
+        w = clip[:, 3]
+        valid = w > self.near
+        w = np.where(valid, w, 1.0)
+
+        xy = np.empty((len(points), 2))
+        xy[:, 0] = (clip[:, 0] / w + 1) * 0.5 * width
+        xy[:, 1] = (1 - clip[:, 1] / w) * 0.5 * height
+        depth = clip[:, 2] / w
+        return xy, depth, valid
+
+
+class SurfaceBVH:
+    """Bounding-volume hierarchy over face bounding boxes
+
+    Faces are sorted along a Morton (Z-order) curve of their centers and the
+    tree halves that order recursively, so the whole build is a handful of
+    vectorized passes. Nodes are stored in flat arrays and own contiguous
+    ranges of the face permutation self.order. Queries walk the tree one
+    level at a time, classifying the whole frontier in one pass.
+    """
+
+    def __init__(self, mesh, leaf_size=128):
+        self.version = mesh.version
+        self.leaf_size = leaf_size
+        vertices, faces = mesh.vertices, mesh.faces
+        self.face_lo = vertices[faces[:, 0]]
+        self.face_hi = self.face_lo.copy()
+        for column in range(1, faces.shape[1]):
+            corner = vertices[faces[:, column]]
+            np.minimum(self.face_lo, corner, out=self.face_lo)
+            np.maximum(self.face_hi, corner, out=self.face_hi)
+        self.order = np.argsort(self._morton_codes(mesh.centers), kind='stable')
+        self._build()
+
+    @staticmethod
+    def _morton_codes(points):
+        """Interleave 10-bit quantized coordinates into 30-bit Z-order codes"""
+        if len(points) == 0:
+            return np.zeros(0, dtype=np.int64)
+        low = points.min(axis=0)
+        span = np.maximum(points.max(axis=0) - low, 1e-12)
+        cells = ((points - low) / span * 1023).astype(np.int64)
+        codes = np.zeros(len(points), dtype=np.int64)
+        for axis in range(3):
+            # Spread the 10 bits of each cell index two bits apart
+            x = cells[:, axis]
+            x = (x | (x << 16)) & 0x30000FF
+            x = (x | (x << 8)) & 0x300F00F
+            x = (x | (x << 4)) & 0x30C30C3
+            x = (x | (x << 2)) & 0x9249249
+            codes |= x << axis
+        return codes
+
+    def _build(self):
+        count = len(self.order)
+        starts, counts, lefts = [np.array([0])], [np.array([count])], []
+        total = 1
+        while True:
+            start, n = starts[-1], counts[-1]
+            split = n > self.leaf_size
+            k = int(split.sum())
+            left = np.full(len(start), -1, dtype=np.int64)
+            left[split] = total + 2 * np.arange(k)
+            lefts.append(left)
+            if k == 0:
+                break
+
+            half = n[split] // 2
+            child_start = np.empty(2 * k, dtype=np.int64)
+            child_count = np.empty(2 * k, dtype=np.int64)
+            child_start[0::2] = start[split]
+            child_start[1::2] = start[split] + half
+            child_count[0::2] = half
+            child_count[1::2] = n[split] - half
+            starts.append(child_start)
+            counts.append(child_count)
+            total += 2 * k
+
+        self.start = np.concatenate(starts)
+        self.count = np.concatenate(counts)
+        self.left = np.concatenate(lefts)
+        if count == 0:
+            self.lo = self.hi = np.zeros((0, 3))
+            self.start = self.count = self.left = np.zeros(0, dtype=np.int64)
+            return
+
+        # Leaf bounds in one reduceat, then parents bottom-up level by level
+        self.lo = np.empty((total, 3))
+        self.hi = np.empty((total, 3))
+        leaves = np.flatnonzero(self.left < 0)
+        leaves = leaves[np.argsort(self.start[leaves])]
+        self.lo[leaves] = np.minimum.reduceat(self.face_lo[self.order], self.start[leaves])
+        self.hi[leaves] = np.maximum.reduceat(self.face_hi[self.order], self.start[leaves])
+
+        level_end = np.cumsum([len(level) for level in starts])
+        for end, size in zip(level_end[::-1], [len(level) for level in starts][::-1]):
+            nodes = np.arange(end - size, end)
+            nodes = nodes[self.left[nodes] >= 0]
+            left = self.left[nodes]
+            self.lo[nodes] = np.minimum(self.lo[left], self.lo[left + 1])
+            self.hi[nodes] = np.maximum(self.hi[left], self.hi[left + 1])
+
+    @staticmethod
+    def _classify(planes, lo, hi):
+        """Return (outside, inside) masks of boxes against all planes"""
+        normals = planes[:, :3]
+        positive = normals >= 0
+        # Farthest and nearest box corners along each plane normal
+        far = np.where(positive, hi[:, None, :], lo[:, None, :])
+        near = np.where(positive, lo[:, None, :], hi[:, None, :])
+        far_side = np.einsum('npk,pk->np', far, normals) + planes[:, 3]
+        near_side = np.einsum('npk,pk->np', near, normals) + planes[:, 3]
+        return (far_side < 0).any(axis=1), (near_side >= 0).all(axis=1)
+
+    def _ranges(self, nodes):
+        counts = self.count[nodes]
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self.order[np.repeat(self.start[nodes], counts) + offsets]
+
+    def frustum_cull(self, planes):
+        """Indices of faces whose bounding boxes intersect the frustum"""
+        if len(self.start) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        accepted = []
+        frontier = np.array([0])
+        while len(frontier):
+            outside, inside = self._classify(planes, self.lo[frontier], self.hi[frontier])
+            keep = ~outside
+            accepted.append(self._ranges(frontier[keep & inside]))
+
+            partial = frontier[keep & ~inside]
+            leaves = partial[self.left[partial] < 0]
+            if len(leaves):
+                faces = self._ranges(leaves)
+                outside, _ = self._classify(planes, self.face_lo[faces], self.face_hi[faces])
+                accepted.append(faces[~outside])
+
+            inner = partial[self.left[partial] >= 0]
+            frontier = np.concatenate([self.left[inner], self.left[inner] + 1])
+
+        faces = np.concatenate(accepted)
+        if len(faces) == len(self.order):
+            return np.arange(len(faces))
+        # Sorted indices keep the later gathers over mesh arrays sequential
+        return np.sort(faces)
+
+
+def _trig_roots(alpha, beta, gamma):
+    """Angles where alpha*cos(t) + beta*sin(t) + gamma = 0, NaN where none"""
+    r = np.hypot(alpha, beta)
+    phase = np.arctan2(beta, alpha)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread = np.arccos(-gamma / r)
+    return np.stack([phase + spread, phase - spread], axis=-1)
+
+
+def _quartic_roots(b, c, d, e):
+    """Roots of monic complex quartics z^4 + b z^3 + c z^2 + d z + e (Ferrari)"""
+    # Depressed quartic y^4 + p y^2 + q y + r with z = y - b / 4
+    p = c - 3 * b ** 2 / 8
+    q = d - b * c / 2 + b ** 3 / 8
+    r = e - b * d / 4 + b ** 2 * c / 16 - 3 * b ** 4 / 256
+
+    # Resolvent cubic m^3 + p m^2 + (p^2 / 4 - r) m - q^2 / 8, by Cardano
+    a2, a1, a0 = p, p ** 2 / 4 - r, -q ** 2 / 8
+    cp = a1 - a2 ** 2 / 3
+    cq = 2 * a2 ** 3 / 27 - a2 * a1 / 3 + a0
+    disc = np.sqrt(cq ** 2 / 4 + cp ** 3 / 27)
+    u = np.where(np.abs(-cq / 2 + disc) >= np.abs(-cq / 2 - disc),
+                 -cq / 2 + disc, -cq / 2 - disc) ** (1 / 3)
+    omega = np.exp(2j * np.pi / 3)
+    candidates = []
+    for k in range(3):
+        uk = u * omega ** k
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vk = np.where(uk != 0, -cp / (3 * uk), 0)
+        candidates.append(uk + vk - a2 / 3)
+    candidates = np.stack(candidates)
+    # The largest resolvent root keeps the division by sqrt(m) stable
+    m = np.take_along_axis(candidates, np.abs(candidates).argmax(axis=0)[None], 0)[0]
+
+    s = np.sqrt(2 * m)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(s != 0, 2 * q / s, 0)
+    roots = []
+    for sign in (1, -1):
+        inner = np.sqrt(-(2 * p + 2 * m + sign * t))
+        roots.append((sign * s + inner) / 2)
+        roots.append((sign * s - inner) / 2)
+    return np.stack(roots, axis=-1) - b[..., None] / 4
+
+
+class OrbitVisibility:
+    """Back-face visibility of every face along the orbit camera's circle
+
+    For a camera at (R cos t, R sin t, H) the culling test dot > threshold
+    can only change where n.v = 0 or (n.v)^2 = threshold^2 |v|^2. The first
+    is a first-order and the second a second-order trigonometric polynomial
+    in t, so every crossing is found in closed form. The crossings are kept
+    as a sorted event list; visible_at answers by binary search and replays
+    only the events between the previous query and this one.
+    """
+
+    def __init__(self, mesh, radius=8, height=6, threshold=0.1, checkpoints=32):
+        self.version = mesh.version
+        self.radius = radius
+        self.height = height
+        self.threshold = threshold
+        self.normals = mesh.normals
+        self.centers = mesh.centers
+        count = len(self.normals)
+
+        candidates = np.sort(np.mod(self._crossing_candidates(), 2 * np.pi), axis=1)
+        valid = np.isfinite(candidates)
+        n_valid = valid.sum(axis=1)
+
+        # Label the arc that starts at every candidate by testing its midpoint
+        width = candidates.shape[1]
+        following = np.roll(candidates, -1, axis=1)
+        last = np.maximum(n_valid - 1, 0)
+        rows = np.arange(count)
+        wrap = np.arange(width)[None, :] == last[:, None]
+        following[wrap] = candidates[rows, 0][np.flatnonzero(wrap) // width] + 2 * np.pi
+        midpoints = np.where(valid, (candidates + following) / 2, 0.0)
+        labels = self._visible(midpoints)
+
+        # A candidate is a real crossing where the labels on both sides differ
+        previous = np.roll(labels, 1, axis=1)
+        previous[rows, 0] = labels[rows, last]
+        change = valid & (labels != previous)
+
+        self.initial = self._visible(np.zeros((count, 1)))[:, 0]
+        self.crossings = candidates[change]
+        self.offsets = np.concatenate([[0], np.cumsum(change.sum(axis=1))])
+
+        faces = np.repeat(rows, change.sum(axis=1))
+        order = np.argsort(self.crossings, kind='stable')
+        self.event_angles = self.crossings[order]
+        self.event_faces = faces[order]
+
+        # Snapshots of the mask every few events bound the cost of going back
+        self.checkpoint_every = max(1, -(-len(order) // checkpoints))
+        self._checkpoints = []
+        mask = self.initial.copy()
+        for start in range(0, len(order) + 1, self.checkpoint_every):
+            if start:
+                self._toggle(mask, start - self.checkpoint_every, start)
+            self._checkpoints.append(np.packbits(mask))
+        self._mask = self.initial.copy()
+        self._position = 0
+
+    def _crossing_candidates(self):
+        """Per-face angles where the culling test may change, NaN padded"""
+        n, p = self.normals, self.centers
+        R, H, t2 = self.radius, self.height, self.threshold ** 2
+
+        # n.v = a cos + b sin + c
+        a = R * n[:, 0]
+        b = R * n[:, 1]
+        c = n[:, 2] * H - np.einsum('ij,ij->i', n, p)
+        # |v|^2 = D - E cos - F sin
+        D = R ** 2 + H ** 2 - 2 * H * p[:, 2] + np.einsum('ij,ij->i', p, p)
+        E = 2 * R * p[:, 0]
+        F = 2 * R * p[:, 1]
+
+        # (n.v)^2 - t^2 |v|^2 = k0 + k1 cos + k2 sin + k3 cos 2t + k4 sin 2t
+        k0 = (a ** 2 + b ** 2) / 2 + c ** 2 - t2 * D
+        k1 = 2 * a * c + t2 * E
+        k2 = 2 * b * c + t2 * F
+        k3 = (a ** 2 - b ** 2) / 2
+        k4 = a * b
+
+        # With z = exp(it) that is a quartic in z whose unit-circle roots
+        # are the crossings
+        coefficients = np.stack([(k3 - 1j * k4) / 2, (k1 - 1j * k2) / 2, k0 + 0j,
+                                 (k1 + 1j * k2) / 2, (k3 + 1j * k4) / 2], axis=1)
+        scale = np.abs(coefficients).max(axis=1)
+        quartic = np.abs(coefficients[:, 0]) > 1e-9 * scale
+
+        squared = np.full((len(n), 4), np.nan)
+        if quartic.any():
+            monic = coefficients[quartic] / coefficients[quartic, :1]
+            z = _quartic_roots(monic[:, 1], monic[:, 2], monic[:, 3], monic[:, 4])
+            rows, columns = np.nonzero(np.abs(np.abs(z) - 1) < 1e-3)
+            faces = np.flatnonzero(quartic)[rows]
+            squared[faces, columns] = self._polish(
+                np.angle(z[rows, columns]),
+                k0[faces], k1[faces], k2[faces], k3[faces], k4[faces])
+        flat = ~quartic
+        squared[flat, :2] = _trig_roots(k1[flat], k2[flat], k0[flat])
+
+        return np.concatenate([squared, _trig_roots(a, b, c)], axis=1)
+
+    @staticmethod
+    def _polish(angles, k0, k1, k2, k3, k4, iterations=2):
+        """Newton steps on the trigonometric polynomial to refine the roots"""
+        for _ in range(iterations):
+            cos, sin = np.cos(angles), np.sin(angles)
+            cos2, sin2 = cos * cos - sin * sin, 2 * sin * cos
+            value = k0 + k1 * cos + k2 * sin + k3 * cos2 + k4 * sin2
+            slope = -k1 * sin + k2 * cos - 2 * k3 * sin2 + 2 * k4 * cos2
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = np.where(np.abs(slope) > 1e-12, value / slope, 0)
+            angles = angles - np.clip(step, -0.1, 0.1)
+        return angles
+
+    def _visible(self, angles):
+        """The culling test of cull_back_faces, per face for (F, m) angles"""
+        camera = np.stack([self.radius * np.cos(angles),
+                           self.radius * np.sin(angles),
+                           np.full(angles.shape, float(self.height))], axis=-1)
+        view = camera - self.centers[:, None, :]
+        dots = np.einsum('fk,fmk->fm', self.normals, view)
+        distances = np.sqrt(np.einsum('fmk,fmk->fm', view, view))
+        return dots > self.threshold * distances
+
+    def _toggle(self, mask, start, stop):
+        np.logical_xor.at(mask, self.event_faces[start:stop], True)
+
+    def intervals(self, face):
+        """Visible (start, end) angle intervals of one face within [0, 2 pi)"""
+        crossings = self.crossings[self.offsets[face]:self.offsets[face + 1]]
+        bounds = np.concatenate([[0.0], crossings, [2 * np.pi]])
+        visible = self.initial[face]
+        result = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if visible and end > start:
+                result.append((start, end))
+            visible = not visible
+        return result
+
+    def visible_at(self, angle):
+        """Boolean visibility mask of all faces for the camera at angle"""
+        position = int(np.searchsorted(self.event_angles,
+                                       np.mod(angle, 2 * np.pi), side='right'))
+        if position < self._position or \
+                position - self._position > self.checkpoint_every:
+            checkpoint = position // self.checkpoint_every
+            self._mask = np.unpackbits(self._checkpoints[checkpoint],
+                                       count=len(self.initial)).astype(bool)
+            self._position = checkpoint * self.checkpoint_every
+        self._toggle(self._mask, self._position, position)
+        self._position = position
+        return self._mask.copy()
+
+
+class HierarchicalZBuffer:
+    """Occlusion culling against a low-resolution max-depth pyramid
+
+    The largest front-facing faces on screen are drawn conservatively into
+    a small depth buffer: a texel is written only if an occluder covers it
+    completely, and it takes the occluder's farthest depth. Each coarser
+    level keeps the maximum of its 2x2 children. A face is hidden when its
+    nearest vertex lies behind every texel under its screen bounds, which
+    costs at most four texel reads at the right level.
+    """
+
+    def __init__(self, width=64, height=64, occluders=128):
+        self.width = width
+        self.height = height
+        self.occluders = occluders
+        self.levels = []
+
+    def cull(self, mesh, camera, indices):
+        """Return the subset of indices not hidden behind the occluders"""
+        if len(indices) == 0:
+            return indices
+        faces = mesh.faces[indices]
+        n, k = faces.shape
+        xy, depth, valid = camera.project(mesh.vertices[faces.reshape(-1)],
+                                          self.width, self.height)
+        xy = xy.reshape(n, k, 2)
+        depth = depth.reshape(n, k)
+        valid = valid.reshape(n, k)
+
+        # Reduce over the few corner columns one at a time: much faster than
+        # axis=1 reductions on (n, k) arrays
+        lo, hi = xy[:, 0].copy(), xy[:, 0].copy()
+        nearest, farthest = depth[:, 0].copy(), depth[:, 0].copy()
+        all_valid = valid[:, 0].copy()
+        twice_area = np.zeros(n)
+        for j in range(k):
+            np.minimum(lo, xy[:, j], out=lo)
+            np.maximum(hi, xy[:, j], out=hi)
+            np.minimum(nearest, depth[:, j], out=nearest)
+            np.maximum(farthest, depth[:, j], out=farthest)
+            all_valid &= valid[:, j]
+            following = xy[:, (j + 1) % k]
+            twice_area += xy[:, j, 0] * following[:, 1] - following[:, 0] * xy[:, j, 1]
+
+        # Occluders: the faces with the largest projected (shoelace) area
+        area = np.where(all_valid, np.abs(twice_area) / 2, 0)
+        occluders = np.argpartition(-area, min(self.occluders, n) - 1)[:self.occluders]
+        occluders = occluders[area[occluders] >= 1]
+        self.build(xy[occluders], farthest[occluders], mesh.sizes[indices[occluders]])
+
+        hidden = all_valid & self.test(lo, hi, nearest)
+        return indices[~hidden]
+
+    def build(self, polygons, depths, sizes):
+        """Conservatively rasterize occluder polygons and build the pyramid"""
+        buffer = np.full((self.height, self.width), np.inf)
+        triangles, owners = triangulate_faces(
+            np.broadcast_to(np.arange(polygons.shape[1]), polygons.shape[:2]), sizes)
+        if len(triangles):
+            points = polygons[owners[:, None], triangles]
+            corner_x = np.arange(self.width + 1)[None, None, :]
+            corner_y = np.arange(self.height + 1)[None, :, None]
+            for start in range(0, len(points), 32):
+                tris = points[start:start + 32]
+                p, q = tris, np.roll(tris, -1, axis=1)
+                orientation = np.sign(np.sum(p[:, :, 0] * q[:, :, 1] -
+                                             q[:, :, 0] * p[:, :, 1], axis=1))
+                covered = np.ones((len(tris), self.height + 1, self.width + 1), dtype=bool)
+                for i in range(3):
+                    a = ((p[:, i, 1] - q[:, i, 1]) * orientation)[:, None, None]
+                    b = ((q[:, i, 0] - p[:, i, 0]) * orientation)[:, None, None]
+                    c = ((p[:, i, 0] * q[:, i, 1] - p[:, i, 1] * q[:, i, 0]) *
+                         orientation)[:, None, None]
+                    covered &= a * corner_x + b * corner_y + c >= 0
+                # A texel is covered when all four of its corners are
+                texels = (covered[:, :-1, :-1] & covered[:, 1:, :-1] &
+                          covered[:, :-1, 1:] & covered[:, 1:, 1:])
+                texels &= (orientation != 0)[:, None, None]
+                tri_depth = depths[owners[start:start + 32]][:, None, None]
+                buffer = np.minimum(buffer, np.where(texels, tri_depth, np.inf).min(axis=0))
+
+        self.levels = [buffer]
+        while buffer.shape[0] > 1 or buffer.shape[1] > 1:
+            h, w = buffer.shape
+            padded = np.full((h + h % 2, w + w % 2), np.inf)
+            padded[:h, :w] = buffer
+            buffer = padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2).max(axis=(1, 3))
+            self.levels.append(buffer)
+
+    def test(self, lo, hi, nearest):
+        """True where a screen box lies entirely behind the pyramid"""
+        x0 = np.clip(np.floor(lo[:, 0]), 0, self.width - 1).astype(np.int64)
+        y0 = np.clip(np.floor(lo[:, 1]), 0, self.height - 1).astype(np.int64)
+        x1 = np.clip(np.floor(hi[:, 0]), 0, self.width - 1).astype(np.int64)
+        y1 = np.clip(np.floor(hi[:, 1]), 0, self.height - 1).astype(np.int64)
+
+        hidden = np.zeros(len(lo), dtype=bool)
+        pending = np.ones(len(lo), dtype=bool)
+        for level, depth in enumerate(self.levels):
+            # Use the finest level where the box spans at most 2x2 texels
+            fits = pending & ((x1 >> level) - (x0 >> level) <= 1) & \
+                ((y1 >> level) - (y0 >> level) <= 1)
+            faces = np.flatnonzero(fits)
+            if len(faces):
+                farthest = np.maximum.reduce([
+                    depth[y0[faces] >> level, x0[faces] >> level],
+                    depth[y0[faces] >> level, x1[faces] >> level],
+                    depth[y1[faces] >> level, x0[faces] >> level],
+                    depth[y1[faces] >> level, x1[faces] >> level]])
+                hidden[faces] = nearest[faces] > farthest
+                pending[faces] = False
+        return hidden
+
+
+def triangulate_faces(faces, sizes):
+    """Fan-triangulate padded polygon faces; returns (triangles, face_ids)"""
+    width = faces.shape[1]
+    if width == 3:
+        return faces, np.arange(len(faces))
+
+    fans = np.arange(1, width - 1)
+    keep = fans[None, :] + 1 < sizes[:, None]
+    face_ids, fan = np.nonzero(keep)
+    triangles = np.stack([faces[face_ids, 0],
+                          faces[face_ids, fan + 1],
+                          faces[face_ids, fan + 2]], axis=1)
+    return triangles, face_ids
+
+
+class ZBufferRenderer:
+    """Software z-buffer: rasterizes triangles into NumPy depth and color buffers
+
+    Triangles are split into square bounding-box tiles and every tile is
+    filled with vectorized edge functions, so the Python loop runs per
+    batch of tiles rather than per pixel.
+    """
+
+    tile_sizes = (4, 8, 16, 32)
+    batch_pixels = 1 << 20
+
+    def __init__(self, width=640, height=480, background='white'):
+        self.width = width
+        self.height = height
+        self.background = np.array(mcolors.to_rgb(background)) * 255
+        self.color = np.empty((height, width, 3), dtype=np.uint8)
+        self.depth = np.empty((height, width))
+        self.face_ids = np.empty((height, width), dtype=np.int64)
+        self.clear()
+
+    def clear(self):
+        self.color[:] = self.background.astype(np.uint8)
+        self.depth[:] = np.inf
+        self.face_ids[:] = -1
+
+    def render(self, mesh, camera, indices=None):
+        """Clear the buffers and draw the given faces of mesh from camera"""
+        self.clear()
+        if indices is None:
+            indices = np.arange(len(mesh))
+        if len(indices) == 0:
+            return self.color
+
+        faces = mesh.faces[indices]
+        triangles, tri_faces = triangulate_faces(faces, mesh.sizes[indices])
+        tri_faces = indices[tri_faces]
+
+        xy, depth, valid = camera.project(mesh.vertices, self.width, self.height)
+        keep = valid[triangles].all(axis=1)
+        triangles = triangles[keep]
+        self.rasterize(xy[triangles], depth[triangles], tri_faces[keep])
+
+        drawn = self.face_ids >= 0
+        colors = np.round(mesh.colors[:, :3] * 255).astype(np.uint8)
+        self.color[drawn] = colors[self.face_ids[drawn]]
+        return self.color
+
+    def rasterize(self, xy, depth, face_ids):
+        """Depth-test screen-space triangles (T, 3, 2) into the buffers"""
+        x0 = np.maximum(np.ceil(xy[:, :, 0].min(axis=1) - 0.5), 0)
+        x1 = np.minimum(np.floor(xy[:, :, 0].max(axis=1) - 0.5), self.width - 1)
+        y0 = np.maximum(np.ceil(xy[:, :, 1].min(axis=1) - 0.5), 0)
+        y1 = np.minimum(np.floor(xy[:, :, 1].max(axis=1) - 0.5), self.height - 1)
+
+        # Edge function coefficients: E_i(x, y) = a_i * x + b_i * y + c_i
+        p = xy
+        q = np.roll(xy, -1, axis=1)
+        a = p[:, :, 1] - q[:, :, 1]
+        b = q[:, :, 0] - p[:, :, 0]
+        c = p[:, :, 0] * q[:, :, 1] - p[:, :, 1] * q[:, :, 0]
+        area = c.sum(axis=1)
+
+        keep = (x0 <= x1) & (y0 <= y1) & (np.abs(area) > 1e-12)
+        # Orient every triangle so that inside pixels have positive edges
+        sign = np.sign(area)[:, None]
+        a, b, c = a * sign, b * sign, c * sign
+        area = np.where(keep, np.abs(area), 1.0)
+        # Edge i is opposite vertex (i + 2) % 3, giving that vertex's weight
+        z = np.roll(depth, -2, axis=1) / area[:, None]
+
+        extent = np.maximum(x1 - x0, y1 - y0) + 1
+        lower = 0
+        for size in self.tile_sizes:
+            group = keep & (extent > lower)
+            if size != self.tile_sizes[-1]:
+                group &= extent <= size
+            lower = size
+            tris = np.flatnonzero(group)
+            if len(tris) == 0:
+                continue
+
+            # Split each bounding box into size x size tiles
+            nx = ((x1[tris] - x0[tris]) // size + 1).astype(np.int64)
+            ny = ((y1[tris] - y0[tris]) // size + 1).astype(np.int64)
+            counts = nx * ny
+            tile_tris = np.repeat(tris, counts)
+            local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            tile_nx = np.repeat(nx, counts)
+            tile_x = x0[tile_tris] + (local % tile_nx) * size
+            tile_y = y0[tile_tris] + (local // tile_nx) * size
+
+            per_batch = max(1, self.batch_pixels // (size * size))
+            for start in range(0, len(tile_tris), per_batch):
+                batch = slice(start, start + per_batch)
+                self._fill_tiles(tile_tris[batch], tile_x[batch], tile_y[batch],
+                                 size, x1, y1, a, b, c, z, face_ids)
+
+    def _fill_tiles(self, tris, tile_x, tile_y, size, x1, y1, a, b, c, z, face_ids):
+        offsets = np.arange(size)
+        px = tile_x[:, None, None] + offsets[None, None, :]
+        py = tile_y[:, None, None] + offsets[None, :, None]
+        cx = px + 0.5
+        cy = py + 0.5
+
+        edges = (a[tris][:, :, None, None] * cx[:, None] +
+                 b[tris][:, :, None, None] * cy[:, None] +
+                 c[tris][:, :, None, None])
+        inside = (edges >= 0).all(axis=1)
+        inside &= (px <= x1[tris][:, None, None]) & (py <= y1[tris][:, None, None])
+
+        tile, row, col = np.nonzero(inside)
+        if len(tile) == 0:
+            return
+        frag_depth = np.einsum('nk,nk->n', edges[tile, :, row, col], z[tris[tile]])
+        frag_pixel = py[tile, row, 0] * self.width + px[tile, 0, col]
+        frag_pixel = frag_pixel.astype(np.int64)
+        frag_face = face_ids[tris[tile]]
+
+        # Keep the nearest fragment per pixel, then test it against the buffer
+        order = np.lexsort((frag_depth, frag_pixel))
+        frag_pixel = frag_pixel[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = frag_pixel[1:] != frag_pixel[:-1]
+        order = order[first]
+        frag_pixel = frag_pixel[first]
+        frag_depth = frag_depth[order]
+
+        depth = self.depth.reshape(-1)
+        closer = frag_depth < depth[frag_pixel]
+        depth[frag_pixel[closer]] = frag_depth[closer]
+        self.face_ids.reshape(-1)[frag_pixel[closer]] = frag_face[order[closer]]
+
+
+class FrameRateMeter:
+    """Achieved frames per second over a sliding window of frames"""
+
+    def __init__(self, window=20):
+        self.times = deque(maxlen=window + 1)
+
+    def tick(self):
+        self.times.append(time.perf_counter())
+
+    @property
+    def fps(self):
+        if len(self.times) < 2:
+            return 0.0
+        return (len(self.times) - 1) / (self.times[-1] - self.times[0])
+
+
+def style_axes(ax, limit):
+    """Apply the white-pane style and fixed limits used by the animations"""
     ax.set_facecolor('white')
     ax.xaxis.pane.fill = False
     ax.yaxis.pane.fill = False
@@ -120,79 +1380,240 @@ def animate_hidden_surface_elimination():
     ax.yaxis.pane.set_alpha(0.1)
     ax.zaxis.pane.set_alpha(0.1)
 
-    # Set labels
     ax.set_xlabel('X', color='black')
     ax.set_ylabel('Y', color='black')
     ax.set_zlabel('Z', color='black')
-
-    # Set limits
-    limit = 5
     ax.set_xlim([-limit, limit])
     ax.set_ylim([-limit, limit])
     ax.set_zlim([-limit, limit])
 
+
+class _Stage:
+    """Times one pipeline stage and records it on the profiler's frame"""
+    __slots__ = ('profiler', 'name', 'faces_in', 'faces_out', 'start', 'blocks')
+
+    def __init__(self, profiler, name, faces_in):
+        self.profiler = profiler
+        self.name = name
+        self.faces_in = faces_in
+        self.faces_out = None
+
+    def __enter__(self):
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.profiler.record(self.name, elapsed, self.faces_in, self.faces_out,
+                             sys.getallocatedblocks() - self.blocks)
+
+
+class _NullStage:
+    """Shared do-nothing stage handed out while profiling is disabled"""
+    faces_in = faces_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class FrameProfiler:
+    """Opt-in per-stage timers and face counters for the animation loop
+
+    Each frame records wall-clock time, faces in/out and the net number of
+    allocated memory blocks (sys.getallocatedblocks) for every stage into a
+    ring buffer of the last capacity frames. The matplotlib draw that
+    follows update() is recorded as the 'draw' stage. When disabled,
+    stage() returns a shared no-op context so the loop pays one attribute
+    check per stage.
+    """
+
+    columns = ('frame', 'stage', 'ms', 'faces_in', 'faces_out', 'alloc_blocks')
+
+    def __init__(self, enabled=True, capacity=1000):
+        self.enabled = enabled
+        self.frames = deque(maxlen=capacity)
+        self._current = None
+        self._draw_start = None
+        self._draw_blocks = 0
+
+    def begin_frame(self, frame):
+        if self.enabled:
+            self._finish()
+            self._current = {'frame': frame, 'stages': {}}
+
+    def stage(self, name, faces_in=None):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, faces_in)
+
+    def record(self, name, elapsed, faces_in=None, faces_out=None, blocks=0):
+        if self._current is not None:
+            self._current['stages'][name] = (elapsed * 1000, faces_in, faces_out, blocks)
+
+    def mark_draw_start(self):
+        """Call at the end of update(); the next draw closes the frame"""
+        if self.enabled:
+            self._draw_blocks = sys.getallocatedblocks()
+            self._draw_start = time.perf_counter()
+
+    def watch_draws(self, fig, blit=False):
+        """Time the canvas draw (or blit) that follows each update()"""
+        if not self.enabled:
+            return
+        if blit:
+            blit_region = fig.canvas.blit
+
+            def timed_blit(*args, **kwargs):
+                blit_region(*args, **kwargs)
+                self._on_draw()
+            fig.canvas.blit = timed_blit
+        else:
+            fig.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, *args):
+        if self._draw_start is None:
+            return
+        self.record('draw', time.perf_counter() - self._draw_start,
+                    blocks=sys.getallocatedblocks() - self._draw_blocks)
+        self._draw_start = None
+        self._finish()
+
+    def _finish(self):
+        if self._current is not None:
+            self.frames.append(self._current)
+            self._current = None
+
+    def rows(self):
+        for record in self.frames:
+            for name, values in record['stages'].items():
+                yield (record['frame'], name) + tuple(values)
+
+    def summary(self):
+        """Median milliseconds per stage over the buffered frames"""
+        times = {}
+        for _, name, ms, *_ in self.rows():
+            times.setdefault(name, []).append(ms)
+        return {name: float(np.median(values)) for name, values in times.items()}
+
+    def overlay_text(self):
+        """One line per stage of the last completed frame, for a live overlay"""
+        if not self.frames:
+            return ''
+        record = self.frames[-1]
+        lines = []
+        for name, (ms, faces_in, faces_out, blocks) in record['stages'].items():
+            line = f'{name:>11}: {ms:7.2f} ms'
+            if faces_in is not None:
+                line += f'  {faces_in} -> {faces_out}'
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def dump(self, path):
+        """Write the buffered frames as CSV or JSON, chosen by extension"""
+        self._finish()
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump([dict(zip(self.columns, row)) for row in self.rows()], f, indent=1)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(self.columns)
+                writer.writerows(self.rows())
+
+
+def join_names(surfaces, limit=6):
+    """Comma-separated face names, shortened for large meshes"""
+    names = [s['name'] for s in surfaces[:limit]]
+    if len(surfaces) > limit:
+        names.append(f'... (+{len(surfaces) - limit} more)')
+    return ", ".join(names)
+
+
+def animate_hidden_surface_elimination(sim=None, interval=100, profiler=None,
+                                       overlay=False):
+    """Main animation function"""
+    # Create simulation
+    if sim is None:
+        sim = CubeSimulation()
+    meter = FrameRateMeter()
+    profiler = profiler or FrameProfiler(enabled=False)
+    overlay = overlay and profiler.enabled
+
+    # Set up the figure and 3D axis
+    fig = plt.figure(figsize=(15, 10))
+    ax = fig.add_subplot(111, projection='3d')
+    profiler.watch_draws(fig)
+
+    # Style the plot
+    fig.patch.set_facecolor('white')
+    limit = 5
+    style_axes(ax, limit)
+
     # Animation function
     def update(frame):
-        ax.clear()
+        meter.tick()
+        profiler.begin_frame(frame)
+        with profiler.stage('clear'):
+            ax.clear()
 
-        # Reset style after clear
-        ax.set_facecolor('white')
-        ax.xaxis.pane.fill = False
-        ax.yaxis.pane.fill = False
-        ax.zaxis.pane.fill = False
-        ax.xaxis.pane.set_edgecolor('black')
-        ax.yaxis.pane.set_edgecolor('black')
-        ax.zaxis.pane.set_edgecolor('black')
-        ax.xaxis.pane.set_alpha(0.1)
-        ax.yaxis.pane.set_alpha(0.1)
-        ax.zaxis.pane.set_alpha(0.1)
+            # Reset style after clear
+            style_axes(ax, limit)
 
         # Calculate camera position
         angle = frame * 0.1
         camera_pos = sim.get_camera_position(angle)
 
-        # Perform hidden surface elimination
-        visible, culled = sim.back_face_culling(camera_pos)
-        sim.z_buffer_sort(camera_pos)
+        # Perform hidden surface elimination (orbit visibility is cached)
+        with profiler.stage('cull', len(sim.mesh)) as stage:
+            visible, culled = sim.orbit_culling(angle)
+            stage.faces_out = len(visible)
+        with profiler.stage('sort', len(visible)) as stage:
+            sim.z_buffer_sort(camera_pos)
+            stage.faces_out = len(sim.visible_surfaces)
 
         # Draw visible surfaces
-        for surface in sim.visible_surfaces:
-            vertices = surface['vertices']
-            poly = [[vertices[j] for j in range(len(vertices))]]
-            collection = Poly3DCollection(poly, alpha=0.8)
-            collection.set_facecolor(surface['color'])
-            collection.set_edgecolor('black')
-            collection.set_linewidth(2)
-            ax.add_collection3d(collection)
+        with profiler.stage('collections', len(sim.visible_surfaces)) as stage:
+            for surface in sim.visible_surfaces:
+                vertices = surface['vertices']
+                poly = [[vertices[j] for j in range(len(vertices))]]
+                collection = Poly3DCollection(poly, alpha=0.8)
+                collection.set_facecolor(surface['color'])
+                collection.set_edgecolor('black')
+                collection.set_linewidth(2)
+                ax.add_collection3d(collection)
+            stage.faces_out = len(ax.collections)
 
-        # Draw camera position
-        ax.scatter([camera_pos[0]], [camera_pos[1]], [camera_pos[2]],
-                   color='red', s=100, marker='o')
-
-        # Add title with information
-        visible_names = [s['name'] for s in visible]
-        culled_names = [s['name'] for s in culled]
+        with profiler.stage('annotate'):
+            # Draw camera position
+            ax.scatter([camera_pos[0]], [camera_pos[1]], [camera_pos[2]],
+                       color='red', s=100, marker='o')
 
-        title = f'Hidden Surface Elimination Simulation\n'
-        title += f'Camera: ({camera_pos[0]:.1f}, {camera_pos[1]:.1f}, {camera_pos[2]:.1f})\n'
-        title += f'Visible: {len(visible)}/6 - {", ".join(visible_names)}\n'
-        title += f'Culled: {", ".join(culled_names)}'
+            # Add title with information
+            title = f'Hidden Surface Elimination Simulation\n'
+            title += f'Camera: ({camera_pos[0]:.1f}, {camera_pos[1]:.1f}, {camera_pos[2]:.1f})\n'
+            title += f'Visible: {len(visible)}/{len(sim.mesh)} - {join_names(visible)}\n'
+            title += f'Culled: {join_names(culled)}'
 
-        ax.set_title(title, color='black', fontsize=12)
-        ax.set_xlabel('X', color='black')
-        ax.set_ylabel('Y', color='black')
-        ax.set_zlabel('Z', color='black')
-        ax.set_xlim([-limit, limit])
-        ax.set_ylim([-limit, limit])
-        ax.set_zlim([-limit, limit])
+            ax.set_title(title, color='black', fontsize=12)
+            if overlay:
+                ax.text2D(0.02, 0.02, profiler.overlay_text(), transform=ax.transAxes,
+                          family='monospace', fontsize=9, color='black')
 
         # Print to console
         if frame % 20 == 0:  # Print every 20 frames
             print(
-                f"Frame {frame}: Angle={angle:.2f}, Visible={len(visible)}, Culled={len(culled)}")
-            for i, surface in enumerate(sim.visible_surfaces):
+                f"Frame {frame}: Angle={angle:.2f}, Visible={len(visible)}, Culled={len(culled)}, FPS={meter.fps:.1f}")
+            for i, surface in enumerate(sim.visible_surfaces[:6]):
                 print(
                     f"  {i+1}. {surface['name']} (distance: {surface['distance']:.2f})")
+        profiler.mark_draw_start()
 
     # Create and run animation
     print("Starting Hidden Surface Elimination Simulation...")
@@ -203,7 +1624,96 @@ def animate_hidden_surface_elimination():
     print("\nPress Ctrl+C to stop the simulation.\n")
 
     anim = animation.FuncAnimation(
-        fig, update, frames=200, interval=100, repeat=True)
+        fig, update, frames=200, interval=interval, repeat=True)
+
+    try:
+        plt.show()
+    except KeyboardInterrupt:
+        print("\nSimulation stopped by user.")
+
+    return anim
+
+
+def animate_persistent(sim=None, frames=200, interval=100, blit=True,
+                       profiler=None, overlay=False):
+    """Animation that reuses its artists instead of clearing the axes
+
+    One Poly3DCollection, the camera marker and an info overlay are created
+    once; each frame only swaps the collection's vertices and face colors.
+    Blitting is used when the canvas supports it.
+    """
+    if sim is None:
+        sim = CubeSimulation()
+    mesh = sim.mesh
+    meter = FrameRateMeter()
+    profiler = profiler or FrameProfiler(enabled=False)
+    overlay = overlay and profiler.enabled
+
+    fig = plt.figure(figsize=(15, 10))
+    ax = fig.add_subplot(111, projection='3d')
+    fig.patch.set_facecolor('white')
+    limit = 5
+    style_axes(ax, limit)
+    ax.set_title('Hidden Surface Elimination Simulation (persistent artists)',
+                 color='black', fontsize=12)
+
+    blit = blit and fig.canvas.supports_blit
+    profiler.watch_draws(fig, blit)
+    polygons = mesh.vertices[mesh.faces]
+    face_colors = mesh.colors.copy()
+    face_colors[:, 3] = 0.8
+
+    collection = Poly3DCollection(polygons[:0], edgecolor='black', linewidth=2)
+    ax.add_collection3d(collection)
+    camera_marker, = ax.plot([], [], [], 'o', color='red', markersize=10)
+    info = ax.text2D(0.02, 0.98, '', transform=ax.transAxes,
+                     va='top', color='black', fontsize=11)
+    stats = ax.text2D(0.02, 0.02, '', transform=ax.transAxes,
+                      family='monospace', fontsize=9, color='black')
+    artists = [collection, camera_marker, info, stats]
+    for artist in artists:
+        artist.set_animated(blit)
+
+    def update(frame):
+        meter.tick()
+        profiler.begin_frame(frame)
+        angle = frame * 0.1
+        camera_pos = sim.get_camera_position(angle)
+
+        with profiler.stage('cull', len(mesh)) as stage:
+            visible = sim.cull(Camera(camera_pos), angle=angle)
+            stage.faces_out = len(visible)
+        with profiler.stage('sort', len(visible)) as stage:
+            order = sim.depth_order(camera_pos, visible)
+            stage.faces_out = len(order)
+
+        with profiler.stage('artists', len(order)) as stage:
+            collection.set_verts(polygons[order])
+            collection.set_facecolor(face_colors[order])
+            camera_marker.set_data_3d([camera_pos[0]], [camera_pos[1]], [camera_pos[2]])
+            info.set_text(f'Camera: ({camera_pos[0]:.1f}, {camera_pos[1]:.1f}, {camera_pos[2]:.1f})\n'
+                          f'Visible: {len(visible)}/{len(mesh)}\n'
+                          f'Culled: ' + ', '.join(f'{name} {count}' for name, count
+                                                  in sim.culled_counts.items()) + '\n'
+                          f'FPS: {meter.fps:.1f}')
+            if overlay:
+                stats.set_text(profiler.overlay_text())
+
+            if blit:
+                # Blitted 3D collections are not projected by Axes3D.draw
+                collection.do_3d_projection()
+            stage.faces_out = len(order)
+
+        if frame % 20 == 0:
+            print(f"Frame {frame}: Angle={angle:.2f}, Visible={len(visible)}, "
+                  f"FPS={meter.fps:.1f}")
+        profiler.mark_draw_start()
+        return artists
+
+    print("Starting persistent-artist simulation "
+          f"({'blitting' if blit else 'full redraw'})...")
+    anim = animation.FuncAnimation(
+        fig, update, frames=frames, interval=interval, blit=blit, repeat=True)
 
     try:
         plt.show()
@@ -213,9 +1723,10 @@ def animate_hidden_surface_elimination():
     return anim
 
 
-def static_demo():
+def static_demo(sim=None):
     """Show static views from different angles"""
-    sim = CubeSimulation()
+    if sim is None:
+        sim = CubeSimulation()
 
     angles = [0, np.pi/4, np.pi/2, 3*np.pi/4, np.pi, 5*np.pi/4]
     fig, axes = plt.subplots(2, 3, figsize=(
@@ -252,7 +1763,7 @@ def static_demo():
         ax.set_ylim([-3, 3])
         ax.set_zlim([-3, 3])
         ax.set_title(
-            f'Angle: {angle:.2f}π\nVisible: {len(visible)}/6', color='black')
+            f'Angle: {angle:.2f}π\nVisible: {len(visible)}/{len(sim.mesh)}', color='black')
 
         # Style panes
         ax.xaxis.pane.fill = False
@@ -266,22 +1777,155 @@ def static_demo():
     plt.show()
 
 
-def main():
+# Per-process state for export workers, set once by _init_export_worker
+_export_state = {}
+
+
+def _init_export_worker(sim, width, height, step, fmt, use_orbit):
+    _export_state.update(sim=sim, renderer=ZBufferRenderer(width, height),
+                         step=step, fmt=fmt, use_orbit=use_orbit)
+
+
+def _render_export_frame(frame):
+    """Render one orbit frame and return it encoded for the output stream"""
+    state = _export_state
+    sim = state['sim']
+    angle = frame * state['step']
+    camera_pos = sim.get_camera_position(angle)
+    image = sim.z_buffer_render(camera_pos, renderer=state['renderer'],
+                                angle=angle if state['use_orbit'] else None)
+    if state['fmt'] == 'raw':
+        return image.tobytes()
+    buffer = io.BytesIO()
+    mpimg.imsave(buffer, image, format='png')
+    return buffer.getvalue()
+
+
+def export_frames(output, sim=None, frames=200, width=640, height=480,
+                  workers=None, fmt='png', step=0.1):
+    """Render orbit frames headless across a process pool
+
+    Frames are written in order, either as frame_NNNN.png files inside the
+    output directory or as one raw RGB24 stream (output '-' is stdout).
+    """
+    if sim is None:
+        sim = CubeSimulation()
+    workers = workers or os.cpu_count() or 1
+    # Once the export wraps around the orbit, solving visibility up front
+    # (inherited by every worker) is cheaper than culling each frame
+    use_orbit = frames * step >= 2 * np.pi
+    if use_orbit:
+        sim.precompute_orbit()
+    if sim.bvh is None:
+        sim.build_bvh()
+    initargs = (sim, width, height, step, fmt, use_orbit)
+
+    if fmt == 'png':
+        os.makedirs(output, exist_ok=True)
+        stream = None
+    elif output == '-':
+        stream = sys.stdout.buffer
+    else:
+        stream = open(output, 'wb')
+
+    start = time.perf_counter()
+    pool = None
+    try:
+        if workers == 1:
+            _init_export_worker(*initargs)
+            results = map(_render_export_frame, range(frames))
+        else:
+            pool = ProcessPoolExecutor(workers, initializer=_init_export_worker,
+                                       initargs=initargs)
+            chunksize = max(1, frames // (workers * 4))
+            results = pool.map(_render_export_frame, range(frames),
+                               chunksize=chunksize)
+
+        for frame, data in enumerate(results):
+            if stream is None:
+                path = os.path.join(output, f'frame_{frame:04d}.png')
+                with open(path, 'wb') as f:
+                    f.write(data)
+            else:
+                stream.write(data)
+    finally:
+        # Also on errors or Ctrl+C, so no worker outlives the export
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if stream is not None and stream is not sys.stdout.buffer:
+            stream.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Exported {frames} frames ({width}x{height}, {workers} workers) "
+          f"in {elapsed:.2f}s: {frames / elapsed:.1f} frames/s", file=sys.stderr)
+    if fmt == 'raw':
+        print(f"Encode with: ffmpeg -f rawvideo -pix_fmt rgb24 -s {width}x{height} "
+              f"-i {output} out.mp4", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Hidden surface elimination simulation')
+    parser.add_argument('--export', metavar='PATH',
+                        help='render frames headless to a PNG directory or raw '
+                             'RGB24 file ("-" for stdout) instead of opening a window')
+    parser.add_argument('--format', choices=['png', 'raw'], default='png',
+                        help='export format (default: png)')
+    parser.add_argument('--mesh', metavar='FILE',
+                        help='OBJ or PLY mesh to use instead of the cube')
+    parser.add_argument('--occlusion', action='store_true',
+                        help='enable hierarchical-Z occlusion culling')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='record per-stage frame timings of the animation '
+                             'and write them to FILE (.csv or .json) on exit')
+    parser.add_argument('--overlay', action='store_true',
+                        help='show the per-stage timings live in the animation')
+    parser.add_argument('--frames', type=int, default=200,
+                        help='number of orbit frames to export (default: 200)')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('--step', type=float, default=0.1,
+                        help='camera angle step per frame in radians (default: 0.1)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main function"""
+    args = parse_args(argv)
+    sim = MeshSimulation(args.mesh) if args.mesh else CubeSimulation()
+    if args.occlusion:
+        sim.enable_occlusion_culling()
+    if args.export:
+        export_frames(args.export, sim=sim, frames=args.frames, width=args.width,
+                      height=args.height, workers=args.workers,
+                      fmt=args.format, step=args.step)
+        return
+
     print("=== Hidden Surface Elimination Simulation ===\n")
     print("Choose simulation type:")
     print("1. Animated Simulation (rotating camera)")
     print("2. Static Views (6 different angles)")
+    print("3. Animated Simulation (persistent artists with blitting)")
 
+    profiler = FrameProfiler(enabled=bool(args.profile or args.overlay))
     try:
-        choice = input("Enter choice (1 or 2): ").strip()
+        choice = input("Enter choice (1, 2 or 3): ").strip()
 
         if choice == '1':
-            animate_hidden_surface_elimination()
+            animate_hidden_surface_elimination(sim, profiler=profiler,
+                                               overlay=args.overlay)
+        elif choice == '3':
+            animate_persistent(sim, profiler=profiler, overlay=args.overlay)
         else:
-            static_demo()
+            static_demo(sim)
     except KeyboardInterrupt:
         print("\nSimulation stopped.")
+    finally:
+        if args.profile:
+            profiler.dump(args.profile)
+            print(f"Stage timings written to {args.profile}")
 
 
 if __name__ == "__main__":
@@ -301,10 +1945,16 @@ Features:
    - Colored faces show visible surfaces
    - Missing faces represent culled (hidden) surfaces
 4. **Console Output**: Real-time information about visible/culled surfaces
+5. **Stage Profiling**: --profile FILE records per-stage timings, face
+   counts and allocations for every frame; --overlay shows them live
 
 Algorithms Demonstrated:
 - **Back-Face Culling**: Removes faces pointing away from viewer
 - **Depth Sorting**: Orders visible faces by distance
+- **Orbit Visibility**: Solves the angles where each face turns visible or
+  hidden on the camera's circle, so looping animations skip re-culling
+- **Z-Buffer Rasterization**: ZBufferRenderer resolves visibility per pixel
+  in a NumPy depth/color framebuffer, without matplotlib
 - **Real-time Processing**: Updates visibility as camera moves
 
 Educational Value:
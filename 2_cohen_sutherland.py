@@ -1,4 +1,9 @@
 import matplotlib.pyplot as plt
+import numpy as np
+import argparse
+import os
+import sys
+import time
 
 # Clipping window boundaries
 x_left, x_right, y_bottom, y_top = 120, 500, 100, 350
@@ -7,22 +12,54 @@ x_left, x_right, y_bottom, y_top = 120, 500, 100, 350
 LEFT, RIGHT, BOTTOM, TOP = 1, 2, 4, 8
 
 
-def region_code(x, y):
+class ClipWindow:
+    """Axis-aligned clipping window with its bounds as precomputed constants
+
+    Instances are never modified after construction, so one window can be
+    shared by any number of threads.
+    """
+    __slots__ = ('left', 'right', 'bottom', 'top', 'bounds')
+
+    def __init__(self, left, right, bottom, top):
+        if left > right or bottom > top:
+            raise ValueError(f"Empty clip window: x {left}..{right}, y {bottom}..{top}")
+        self.left, self.right = float(left), float(right)
+        self.bottom, self.top = float(bottom), float(top)
+        self.bounds = np.array([self.left, self.right, self.bottom, self.top])
+
+    def __repr__(self):
+        return f"ClipWindow({self.left:g}, {self.right:g}, {self.bottom:g}, {self.top:g})"
+
+    @staticmethod
+    def tiles(left, right, bottom, top, columns, rows):
+        """(columns * rows, 4) left, right, bottom, top bounds of a tile grid"""
+        xs = np.linspace(left, right, columns + 1)
+        ys = np.linspace(bottom, top, rows + 1)
+        x0, y0 = np.meshgrid(xs[:-1], ys[:-1])
+        x1, y1 = np.meshgrid(xs[1:], ys[1:])
+        return np.stack([x0, x1, y0, y1], axis=-1).reshape(-1, 4)
+
+
+# The lab's window; used whenever no window is passed
+WINDOW = ClipWindow(x_left, x_right, y_bottom, y_top)
+
+
+def region_code(x, y, window=WINDOW):
     code = 0
-    if x > x_right:
+    if x > window.right:
         code |= RIGHT
-    elif x < x_left:
+    elif x < window.left:
         code |= LEFT
-    if y > y_top:
+    if y > window.top:
         code |= TOP
-    elif y < y_bottom:
+    elif y < window.bottom:
         code |= BOTTOM
     return code
 
 
-def cohen_sutherland(x1, y1, x2, y2, ax):
-    code1 = region_code(x1, y1)
-    code2 = region_code(x2, y2)
+def cohen_sutherland(x1, y1, x2, y2, ax, window=WINDOW):
+    code1 = region_code(x1, y1, window)
+    code2 = region_code(x2, y2, window)
 
     while True:
         if not (code1 | code2):
@@ -37,33 +74,239 @@ def cohen_sutherland(x1, y1, x2, y2, ax):
             out_code = code1 if code1 else code2
 
             if out_code & TOP:
-                y = y_top
+                y = window.top
                 x = x1 + (x2 - x1) / (y2 - y1) * (y - y1)
             elif out_code & BOTTOM:
-                y = y_bottom
+                y = window.bottom
                 x = x1 + (x2 - x1) / (y2 - y1) * (y - y1)
             elif out_code & LEFT:
-                x = x_left
+                x = window.left
                 y = y1 + (y2 - y1) / (x2 - x1) * (x - x1)
             elif out_code & RIGHT:
-                x = x_right
+                x = window.right
                 y = y1 + (y2 - y1) / (x2 - x1) * (x - x1)
 
             if out_code == code1:
                 x1, y1 = x, y
-                code1 = region_code(x1, y1)
+                code1 = region_code(x1, y1, window)
             else:
                 x2, y2 = x, y
-                code2 = region_code(x2, y2)
+                code2 = region_code(x2, y2, window)
+
+
+def region_codes(x, y, bounds=WINDOW.bounds):
+    """Vectorized region_code: uint8 codes for arrays of points
+
+    bounds is (left, right, bottom, top), each a scalar or one value per
+    point.
+    """
+    left, right, bottom, top = bounds
+    codes = np.where(x > right, RIGHT, np.where(x < left, LEFT, 0)).astype(np.uint8)
+    codes |= np.where(y > top, TOP, np.where(y < bottom, BOTTOM, 0)).astype(np.uint8)
+    return codes
+
+
+def _clip_rows(clipped, bounds):
+    """Cohen-Sutherland on (N, 4) rows in place
+
+    bounds is one window (4,) or a window per row (4, N).
+    """
+    per_row = bounds.ndim == 2
+    x1, y1, x2, y2 = clipped.T
+    code1 = region_codes(x1, y1, bounds)
+    code2 = region_codes(x2, y2, bounds)
+    keep = (code1 & code2) == 0
+    active = np.flatnonzero(keep & ((code1 | code2) != 0))
+
+    while len(active):
+        window = bounds[:, active] if per_row else bounds
+        left, right, bottom, top = window
+        c1, c2 = code1[active], code2[active]
+        first = c1 != 0
+        out_code = np.where(first, c1, c2)
+        ax1, ay1, ax2, ay2 = x1[active], y1[active], x2[active], y2[active]
+
+        # Same edge priority as cohen_sutherland: top, bottom, left, right
+        is_top = (out_code & TOP) != 0
+        is_bottom = ~is_top & ((out_code & BOTTOM) != 0)
+        is_left = ~is_top & ~is_bottom & ((out_code & LEFT) != 0)
+        horizontal = is_top | is_bottom
+        y = np.where(is_top, top, bottom)
+        x = np.where(is_left, left, right)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = np.where(horizontal, ax1 + (ax2 - ax1) / (ay2 - ay1) * (y - ay1), x)
+            y = np.where(horizontal, y, ay1 + (ay2 - ay1) / (ax2 - ax1) * (x - ax1))
+
+        moved = active[first]
+        x1[moved], y1[moved] = x[first], y[first]
+        code1[moved] = region_codes(x[first], y[first],
+                                    window[:, first] if per_row else window)
+        moved = active[~first]
+        x2[moved], y2[moved] = x[~first], y[~first]
+        code2[moved] = region_codes(x[~first], y[~first],
+                                    window[:, ~first] if per_row else window)
+
+        c1, c2 = code1[active], code2[active]
+        keep[active[(c1 & c2) != 0]] = False
+        active = active[((c1 | c2) != 0) & ((c1 & c2) == 0)]
+
+    clipped[~keep] = np.nan
+    return keep
+
+
+def _liang_barsky_rows(clipped, bounds):
+    """Liang-Barsky on (N, 4) rows in place: one parametric pass, no loop
+
+    bounds is one window (4,) or a window per row (4, N).
+    """
+    left, right, bottom, top = bounds
+    x1, y1, x2, y2 = clipped.T
+    dx, dy = x2 - x1, y2 - y1
+    t0 = np.zeros(len(clipped))
+    t1 = np.ones(len(clipped))
+    keep = np.ones(len(clipped), dtype=bool)
+
+    # Edge i is crossed at t = q / p; p < 0 enters the window, p > 0 leaves
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for p, q in ((-dx, x1 - left), (dx, right - x1), (-dy, y1 - bottom), (dy, top - y1)):
+            t = q / p
+            keep &= (p != 0) | (q >= 0)
+            t0 = np.where(p < 0, np.maximum(t0, t), t0)
+            t1 = np.where(p > 0, np.minimum(t1, t), t1)
+    keep &= t0 <= t1
+
+    start_x, start_y = x1 + t0 * dx, y1 + t0 * dy
+    clipped[:, 2], clipped[:, 3] = x1 + t1 * dx, y1 + t1 * dy
+    clipped[:, 0], clipped[:, 1] = start_x, start_y
+    clipped[~keep] = np.nan
+    return keep
+
+
+ENGINES = {
+    'cohen-sutherland': _clip_rows,
+    'liang-barsky': _liang_barsky_rows
+}
+
+
+def clip_segments(segments, window=WINDOW, engine='cohen-sutherland'):
+    """Clip an (N, 4) array of x1, y1, x2, y2 segments against the window
+
+    Returns (clipped, keep): the clipped (N, 4) coordinates and a boolean
+    mask of the segments that are at least partly inside. With the default
+    Cohen-Sutherland engine segments are trivially accepted or rejected in
+    bulk; only the remaining ones go through the intersection loop, which
+    moves one outside endpoint per pass in the same order as
+    cohen_sutherland. engine='liang-barsky' clips every segment in a single
+    parametric pass instead. Rejected rows are NaN.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown clipping engine {engine!r}; choose from {', '.join(ENGINES)}")
+    clipped = np.array(segments, dtype=float).reshape(-1, 4)
+    keep = ENGINES[engine](clipped, window.bounds)
+    return clipped, keep
+
+
+def clip_segments_windows(segments, windows, batch_pairs=1 << 22, engine='cohen-sutherland'):
+    """Clip one segment set against many windows (e.g. viewport tiles)
+
+    windows is a sequence of ClipWindow or a (W, 4) array of left, right,
+    bottom, top. Segment/window pairs whose bounding boxes do not overlap
+    (exactly the trivial rejects) are dropped in chunks of about
+    batch_pairs; all remaining pairs are clipped in one batched pass.
+    Returns (offsets, segment_ids, clipped): the results for window w are
+    rows offsets[w]:offsets[w + 1], ordered by segment id.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown clipping engine {engine!r}; choose from {', '.join(ENGINES)}")
+    segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+    if not isinstance(windows, np.ndarray):
+        windows = np.array([window.bounds for window in windows]).reshape(-1, 4)
+    left, right, bottom, top = windows.T[:, None, :]
+
+    x_min = np.minimum(segments[:, 0], segments[:, 2])[:, None]
+    x_max = np.maximum(segments[:, 0], segments[:, 2])[:, None]
+    y_min = np.minimum(segments[:, 1], segments[:, 3])[:, None]
+    y_max = np.maximum(segments[:, 1], segments[:, 3])[:, None]
+    chunk = max(1, batch_pairs // max(len(windows), 1))
+    pairs = [np.nonzero((x_min[i:i + chunk] <= right) & (x_max[i:i + chunk] >= left) &
+                        (y_min[i:i + chunk] <= top) & (y_max[i:i + chunk] >= bottom))
+             for i in range(0, len(segments), chunk)]
+    segment_ids = np.concatenate([rows + i * chunk for i, (rows, _) in enumerate(pairs)]
+                                 or [np.empty(0, np.int64)])
+    window_ids = np.concatenate([columns for _, columns in pairs] or [np.empty(0, np.int64)])
+
+    order = np.argsort(window_ids, kind='stable')
+    segment_ids, window_ids = segment_ids[order], window_ids[order]
+    clipped = segments[segment_ids]
+    keep = ENGINES[engine](clipped, np.ascontiguousarray(windows[window_ids].T))
+
+    window_ids = window_ids[keep]
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(window_ids, minlength=len(windows)))])
+    return offsets, segment_ids[keep], clipped[keep]
+
+
+def clip_file(input_path, output_path, window=WINDOW, engine='cohen-sutherland',
+              chunk_segments=1 << 20):
+    """Clip a binary file of float32 x1, y1, x2, y2 segments chunk by chunk
+
+    Surviving (clipped) segments are written to output_path in the same
+    layout. One chunk buffer is reused throughout, so memory stays constant
+    however large the file is. Returns (segments read, segments written,
+    seconds).
+    """
+    record = 4 * np.dtype(np.float32).itemsize
+    size = os.path.getsize(input_path)
+    if size % record:
+        raise ValueError(f"{input_path} is not a whole number of {record}-byte segments")
+    # Opening the output truncates it before anything is read
+    if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+        raise ValueError(f"{output_path} is also the input file; write to another path")
+
+    buffer = np.empty((chunk_segments, 4), dtype=np.float32)
+    view = memoryview(buffer).cast('B')
+    total = kept = 0
+    start = time.perf_counter()
+    with open(input_path, 'rb') as source, open(output_path, 'wb') as sink:
+        while True:
+            count = source.readinto(view) // record
+            if count == 0:
+                break
+            clipped, keep = clip_segments(buffer[:count], window, engine)
+            clipped[keep].astype(np.float32).tofile(sink)
+            total += count
+            kept += int(keep.sum())
+    return total, kept, time.perf_counter() - start
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Cohen-Sutherland line clipping')
+    parser.add_argument('--window', type=float, nargs=4,
+                        metavar=('LEFT', 'RIGHT', 'BOTTOM', 'TOP'),
+                        default=[x_left, x_right, y_bottom, y_top])
+    parser.add_argument('--clip-file', nargs=2, metavar=('INPUT', 'OUTPUT'),
+                        help='stream-clip a float32 segment file instead of plotting')
+    parser.add_argument('--engine', choices=list(ENGINES), default='cohen-sutherland')
+    parser.add_argument('--chunk', type=int, default=1 << 20,
+                        help='segments per chunk when streaming (default: 1048576)')
+    return parser.parse_args(argv)
+
 
+def main(argv=None):
+    args = parse_args(argv)
+    window = ClipWindow(*args.window)
+    if args.clip_file:
+        total, kept, elapsed = clip_file(*args.clip_file, window, args.engine, args.chunk)
+        print(f"Clipped {total} segments against {window}: kept {kept} "
+              f"in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} segments/s)",
+              file=sys.stderr)
+        return
 
-def main():
     fig, ax = plt.subplots(figsize=(8, 6))
     ax.set_facecolor("white")
 
     # Draw clipping window (yellow rectangle)
-    rect_x = [x_left, x_right, x_right, x_left, x_left]
-    rect_y = [y_bottom, y_bottom, y_top, y_top, y_bottom]
+    rect_x = [window.left, window.right, window.right, window.left, window.left]
+    rect_y = [window.bottom, window.bottom, window.top, window.top, window.bottom]
     ax.plot(rect_x, rect_y, color="orange", linewidth=2)
 
     # Original line (red)
@@ -71,7 +314,7 @@ def main():
     ax.plot([x1, x2], [y1, y2], color="red", linestyle="--", alpha=0.7)
 
     # Clipped line (black)
-    cohen_sutherland(x1, y1, x2, y2, ax)
+    cohen_sutherland(x1, y1, x2, y2, ax, window)
 
     ax.set_xlim(0, 600)
     ax.set_ylim(0, 500)
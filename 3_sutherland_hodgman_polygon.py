@@ -1,4 +1,7 @@
 import matplotlib.pyplot as plt
+import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor
 
 # Clipping window boundaries
 x_min, y_min = 120, 100
@@ -67,6 +70,161 @@ def sutherland_hodgman(polygon):
     return polygon
 
 
+def cross_2d(a, b):
+    """z component of the cross products of matching rows of two (N, 2) arrays"""
+    return a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+
+
+class ClipRegion:
+    """Convex clip region as half-planes normals[e] . p >= limits[e]
+
+    Half-planes whose normal lies along an axis are flagged in axes, so the
+    clipper reads one coordinate column instead of taking dot products and
+    puts crossings exactly on the boundary.
+    """
+
+    def __init__(self, normals, limits, vertices=None):
+        normals = np.asarray(normals, dtype=float).reshape(-1, 2)
+        lengths = np.hypot(normals[:, 0], normals[:, 1])
+        self.normals = normals / lengths[:, None]
+        self.limits = np.asarray(limits, dtype=float).reshape(-1) / lengths
+        self.vertices = vertices
+        axis_aligned = (self.normals == 0).any(axis=1)
+        self.axes = np.where(axis_aligned, np.argmax(np.abs(self.normals), axis=1), -1)
+
+    def __len__(self):
+        return len(self.limits)
+
+    @classmethod
+    def rectangle(cls, x_min, y_min, x_max, y_max):
+        """Axis-aligned window with edges in LEFT, RIGHT, BOTTOM, TOP order"""
+        normals = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+        limits = [x_min, -x_max, y_min, -y_max]
+        vertices = np.array([(x_min, y_min), (x_max, y_min), (x_max, y_max), (x_min, y_max)],
+                            dtype=float)
+        return cls(normals, limits, vertices)
+
+    @classmethod
+    def from_polygon(cls, vertices):
+        """Region inside a convex polygon given in either winding order"""
+        vertices = np.asarray(vertices, dtype=float).reshape(-1, 2)
+        edges = np.roll(vertices, -1, axis=0) - vertices
+        turns = cross_2d(edges, np.roll(edges, -1, axis=0))
+        # Star polygons turn one way at every vertex too, but wind more than
+        # once; repeated vertices are skipped so their turn is not lost
+        steps = edges[(edges != 0).any(axis=1)]
+        following = np.roll(steps, -1, axis=0)
+        turning = np.arctan2(cross_2d(steps, following),
+                             np.einsum('ij,ij->i', steps, following)).sum()
+        if len(vertices) < 3 or not ((turns >= 0).all() or (turns <= 0).all()) \
+                or not np.isclose(abs(turning), 2 * np.pi):
+            raise ValueError("Clip region must be a convex polygon with at least 3 vertices")
+        if turns.sum() < 0:
+            vertices, edges = vertices[::-1], -edges[::-1]
+        # Inward (left-hand) normal of every counter-clockwise edge
+        normals = np.stack([-edges[:, 1], edges[:, 0]], axis=1)
+        keep = (normals != 0).any(axis=1)
+        return cls(normals[keep], np.einsum('ij,ij->i', normals, vertices)[keep], vertices)
+
+
+# Integer edge ids of the lab's window; they index the region's half-planes
+LEFT, RIGHT, BOTTOM, TOP = range(4)
+WINDOW = ClipRegion.rectangle(x_min, y_min, x_max, y_max)
+
+
+def clip_ragged(points, offsets, edge, region=WINDOW):
+    """Clip many polygons in ragged layout against one boundary at once
+
+    points is the (V, 2) vertex array of all polygons and offsets the (P + 1)
+    start indices, so polygon i is points[offsets[i]:offsets[i + 1]].
+    Every vertex contributes the crossing with the edge from its previous
+    vertex (when the boundary is crossed) followed by itself (when inside),
+    exactly as clip_polygon; all of it is assembled in one scatter.
+    Returns the clipped (points, offsets).
+    """
+    if len(points) == 0:
+        return points, offsets
+    starts, ends = offsets[:-1], offsets[1:]
+    nonempty = ends > starts
+    previous = np.arange(-1, len(points) - 1)
+    previous[starts[nonempty]] = ends[nonempty] - 1
+
+    axis, normal, limit = region.axes[edge], region.normals[edge], region.limits[edge]
+    if axis >= 0:
+        side = normal[axis]
+        projection = points[:, axis] * side
+    else:
+        projection = points @ normal
+    curr_in = projection >= limit
+    crossing = curr_in != curr_in[previous]
+
+    # Crossings interpolate the signed distances to the boundary; no slopes,
+    # so vertical and horizontal polygon edges need no special cases
+    behind = previous[crossing]
+    a, b = points[behind], points[crossing]
+    t = (limit - projection[behind]) / (projection[crossing] - projection[behind])
+    hits = a + t[:, None] * (b - a)
+    if axis >= 0:
+        hits[:, axis] = limit / side
+
+    counts = curr_in.astype(np.int64) + crossing
+    totals = np.concatenate([[0], np.cumsum(counts)])
+    first = totals[:-1]
+    clipped = np.empty((totals[-1], 2))
+    clipped[first[crossing]] = hits
+    clipped[(first + crossing)[curr_in]] = points[curr_in]
+    return clipped, totals[offsets]
+
+
+def clip_polygon_array(points, edge, region=WINDOW):
+    """Clip an (N, 2) vertex array against one boundary with NumPy masks"""
+    return clip_ragged(points, np.array([0, len(points)]), edge, region)[0]
+
+
+def sutherland_hodgman_array(points, region=WINDOW):
+    """Vectorized sutherland_hodgman: clip an (N, 2) array, return (M, 2)"""
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    for edge in range(len(region)):
+        points = clip_polygon_array(points, edge, region)
+    return points
+
+
+def _clip_ragged_region(points, offsets, region):
+    for edge in range(len(region)):
+        points, offsets = clip_ragged(points, offsets, edge, region)
+    return points, offsets
+
+
+def clip_polygons(points, offsets, region=WINDOW, workers=None, parallel_vertices=1 << 21):
+    """Clip a whole layer of polygons given in ragged (points, offsets) layout
+
+    All polygons go through each edge of the (convex) region in a single
+    vectorized pass. Inputs with more than parallel_vertices vertices are
+    split into contiguous runs of polygons with similar vertex counts and
+    clipped on a process pool. Returns (points, offsets) in the same
+    layout; polygons clipped away entirely keep their slot as an empty
+    range.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(points) <= parallel_vertices:
+        return _clip_ragged_region(points, offsets, region)
+
+    # Cut at polygon boundaries close to equal shares of the vertices
+    cuts = np.searchsorted(offsets, np.linspace(0, len(points), workers * 4 + 1))
+    cuts = np.unique(np.clip(cuts, 0, len(offsets) - 1))
+    chunks = [(points[offsets[lo]:offsets[hi]], offsets[lo:hi + 1] - offsets[lo], region)
+              for lo, hi in zip(cuts[:-1], cuts[1:])]
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(_clip_ragged_region, *zip(*chunks)))
+
+    sizes = np.cumsum([0] + [len(part) for part, _ in results])
+    offsets = np.concatenate([[0]] + [part_offsets[1:] + base
+                                      for (_, part_offsets), base in zip(results, sizes)])
+    return np.concatenate([part for part, _ in results]), offsets
+
+
 def main():
     # Example polygon
     polygon = [(100, 150), (200, 50), (300, 100),
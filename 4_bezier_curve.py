@@ -1,45 +1,122 @@
 import math
+from functools import lru_cache
 import matplotlib.pyplot as plt
+import numpy as np
 from matplotlib.patches import Circle
 
 
-def factorial(n: int) -> int:
-    if n:
-        return n * factorial(n - 1)
-    return 1
-
-
-def nCr(n: int, r: int) -> float:
-    return factorial(n) / float(factorial(r) * factorial(n - r))
-
-
-def bezier_function(k: int, n: int, u: float) -> float:
-    return nCr(n, k) * pow(u, k) * pow(1 - u, n - k)
-
-
-def bezier_curve(points, eps: float = 1e-4):
-    n = len(points) - 1
-    xs, ys = [], []
-    steps = int(1.0 / eps)
-
-    for i in range(steps + 1):
-        u = i * eps
-        x = 0.0
-        y = 0.0
-        for k in range(n + 1):
-            bez = bezier_function(k, n, u)
-            x += points[k][0] * bez
-            y += points[k][1] * bez
-        xs.append(x)
-        ys.append(y)
-
+@lru_cache(maxsize=64)
+def bernstein_basis(degree: int, samples: int) -> np.ndarray:
+    """(samples, degree + 1) Bernstein basis at evenly spaced u in [0, 1]
+
+    Memoized per (degree, samples); the returned array is read-only because
+    it is shared between callers.
+    """
+    u = np.linspace(0.0, 1.0, samples)[:, None]
+    k = np.arange(degree + 1)
+    coefficients = np.array([math.comb(degree, i) for i in k], dtype=float)
+    basis = coefficients * u ** k * (1 - u) ** (degree - k)
+    basis.flags.writeable = False
+    return basis
+
+
+def evaluate_bezier(points, samples: int) -> np.ndarray:
+    """(samples, 2) curve points as one basis-matrix product"""
+    points = np.asarray(points, dtype=float)
+    return bernstein_basis(len(points) - 1, samples) @ points
+
+
+def split_bezier(points: np.ndarray):
+    """de Casteljau split at u = 0.5 into left and right control polygons"""
+    left, right = [points[0]], [points[-1]]
+    while len(points) > 1:
+        points = (points[:-1] + points[1:]) * 0.5
+        left.append(points[0])
+        right.append(points[-1])
+    return np.array(left), np.array(right[::-1])
+
+
+def is_flat(points: np.ndarray, tolerance: float) -> bool:
+    """True if every control point is within tolerance of the chord segment"""
+    chord = points[-1] - points[0]
+    offsets = points[1:-1] - points[0]
+    length_sq = chord @ chord
+    # Clamp onto the segment so control points overshooting an end, even
+    # collinear ones, count as far away
+    t = np.clip(offsets @ chord / length_sq, 0, 1) if length_sq else 0
+    gaps = offsets - np.multiply.outer(t, chord)
+    distances = np.hypot(gaps[:, 0], gaps[:, 1])
+    return distances.size == 0 or distances.max() <= tolerance
+
+
+def flatten_bezier(points, tolerance: float = 0.25, max_depth: int = 24) -> np.ndarray:
+    """Adaptive polyline of a Bezier curve by recursive de Casteljau subdivision
+
+    A piece is emitted as one straight segment once its control polygon lies
+    within tolerance (in the units of the points) of its chord, so flat
+    parts cost two points and sharp bends get as many as they need. Uses an
+    explicit stack instead of recursion; returns an (M, 2) array.
+    """
+    points = np.asarray(points, dtype=float)
+    polyline = [points[0]]
+    stack = [(points, 0)]
+    while stack:
+        piece, depth = stack.pop()
+        if depth >= max_depth or is_flat(piece, tolerance):
+            polyline.append(piece[-1])
+        else:
+            left, right = split_bezier(piece)
+            stack.append((right, depth + 1))
+            stack.append((left, depth + 1))
+    return np.array(polyline)
+
+
+def evaluate_beziers(curves, samples: int, out=None, chunk_curves: int = 1 << 14) -> np.ndarray:
+    """Sample many Bezier curves at once; returns (curves, samples, 2)
+
+    curves is a (C, K, 2) array of equal-degree control polygons, or a
+    sequence of (K_i, 2) control polygons of mixed degrees, which are
+    grouped by degree internally and returned in input order. Curves are
+    multiplied by the cached basis chunk_curves at a time straight into out
+    (allocated if not given, e.g. pass a np.memmap for huge batches), so
+    temporaries stay bounded.
+    """
+    if isinstance(curves, np.ndarray):
+        groups = {curves.shape[1] - 1: (np.arange(len(curves)), curves)}
+        count = len(curves)
+    else:
+        count = len(curves)
+        degrees = np.array([len(curve) - 1 for curve in curves])
+        groups = {}
+        for degree in np.unique(degrees):
+            indices = np.flatnonzero(degrees == degree)
+            groups[int(degree)] = (indices, np.array([curves[i] for i in indices], dtype=float))
+    if out is None:
+        out = np.empty((count, samples, 2))
+
+    for degree, (indices, controls) in groups.items():
+        basis = bernstein_basis(degree, samples)
+        contiguous = len(indices) == count
+        for lo in range(0, len(indices), chunk_curves):
+            chunk = np.asarray(controls[lo:lo + chunk_curves], dtype=float)
+            if contiguous:
+                np.matmul(basis, chunk, out=out[lo:lo + len(chunk)])
+            else:
+                out[indices[lo:lo + len(chunk)]] = basis @ chunk
+    return out
+
+
+def plot_bezier(curve, points, joined: bool = False):
+    """Thin plotting layer: curve samples as black pixels, control points in red"""
     # Prepare canvas
     fig, ax = plt.subplots(figsize=(8, 6))
     fig.patch.set_facecolor("white")
     ax.set_facecolor("white")
 
-    # Draw curve as black pixels (points)
-    ax.plot(xs, ys, linestyle="None", marker=".", markersize=2, color="black")
+    # Draw curve as black pixels (points); adaptive polylines also join them
+    xs, ys = np.asarray(curve).T
+    ax.plot(xs, ys, linestyle="-" if joined else "None",
+            marker=".", markersize=2, color="black", linewidth=1)
 
     # Draw control points and small circles (radius ≈ 5 pixels)
     for (cx, cy) in points:
@@ -61,9 +138,22 @@ def bezier_curve(points, eps: float = 1e-4):
     plt.show()
 
 
+def bezier_curve(points, eps: float = 1e-4, tolerance: float = None):
+    if tolerance is None:
+        steps = int(1.0 / eps)
+        curve = evaluate_bezier(points, steps + 1)
+        print(f"Uniform sampling: {len(curve)} points")
+    else:
+        curve = flatten_bezier(points, tolerance)
+        print(f"Adaptive tessellation (tolerance {tolerance}): {len(curve)} points")
+    plot_bezier(curve, points, joined=tolerance is not None)
+    return curve
+
+
 def main():
     points = [(27, 243), (101, 47), (324, 197), (437, 23)]
     bezier_curve(points)
+    bezier_curve(points, tolerance=0.25)
 
 
 if __name__ == "__main__":
@@ -1,42 +1,46 @@
 import sys
-import math
+import argparse
+import numpy as np
 import matplotlib.pyplot as plt
+from transform_2d import (AffineTransform, add_input_arguments, apply_to_lists,
+                          output_dtype, read_input, resolve_parameters,
+                          write_points)
 
 
 def draw(x, y):
     """Draw polygon by connecting vertices"""
     n = len(x)
-    xs = x + [x[0]]  # Close the polygon
-    ys = y + [y[0]]
+    xs = np.append(x, x[0])  # Close the polygon
+    ys = np.append(y, y[0])
     plt.plot(xs, ys, linewidth=2)
 
 
 def rotation(x, y, n, angle, xp, yp):
     """Apply 2D rotation to polygon vertices"""
-    for i in range(n):
-        radian = angle * (math.pi / 180)
-        sin_term = math.sin(radian)
-        cos_term = math.cos(radian)
-        x_shift = x[i] - xp
-        y_shift = y[i] - yp
-        x[i] = xp + (x_shift * cos_term) - (y_shift * sin_term)
-        y[i] = yp + (x_shift * sin_term) + (y_shift * cos_term)
-
-
-def main():
-    # Read input
-    n = int(input())  # Total vertex of the polygon
-    x = []
-    y = []
-
-    # Read (x,y) coordinates of vertex points
-    for i in range(n):
-        xi, yi = map(int, input().split())
-        x.append(xi)
-        y.append(yi)
-
-    angle = int(input())  # Rotation angle in degree
-    x_pivot, y_pivot = map(int, input().split())  # Pivot point coordinates
+    apply_to_lists(AffineTransform.rotation(angle, (xp, yp)), x, y, n)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='2D polygon rotation')
+    add_input_arguments(parser)
+    parser.add_argument('--angle', type=float, help='rotation angle in degrees')
+    parser.add_argument('--pivot', type=float, nargs=2, metavar=('XP', 'YP'),
+                        help='pivot point coordinates')
+    args = parser.parse_args(argv)
+
+    # Read input: vertices (and parameters) in one bulk parse, or a binary file
+    points, parameters = read_input(parser, args, 3)
+    n = len(points)  # Total vertex of the polygon
+    x = points[:, 0].copy()
+    y = points[:, 1].copy()
+    angle, (x_pivot, y_pivot) = resolve_parameters(
+        parser, parameters, (args.angle, 1, 'rotation angle'), (args.pivot, 2, 'pivot point'))
+
+    if args.output:
+        # Large inputs: transform and write the vertices without plotting
+        rotation(x, y, n, angle, x_pivot, y_pivot)
+        write_points(args.output, np.column_stack([x, y]), output_dtype(args))
+        return
 
     # Setup matplotlib to mimic graphics.h behavior
     plt.figure(figsize=(10, 8))
@@ -85,6 +89,11 @@ Alternative: You can also create an input file (input.txt) with:
 
 Then run: python3 rotation_standalone.py < input.txt
 
+Large inputs skip per-line parsing: the whole text input is parsed at once,
+or pass a binary vertex file plus the parameters as flags and write the
+result instead of plotting (see --help):
+    python3 5_two_dimentional_rotaion.py --binary points.npy --angle 45 --pivot 200 200 --output out.npy
+
 The input format is:
 - First line: number of vertices (n)
 - Next n lines: x y coordinates of each vertex
@@ -1,35 +1,44 @@
 import sys
+import argparse
+import numpy as np
 import matplotlib.pyplot as plt
+from transform_2d import (AffineTransform, add_input_arguments, apply_to_lists,
+                          output_dtype, read_input, resolve_parameters,
+                          write_points)
 
 
 def draw(x, y):
     """Draw polygon by connecting vertices"""
     n = len(x)
-    xs = x + [x[0]]  # Close the polygon
-    ys = y + [y[0]]
+    xs = np.append(x, x[0])  # Close the polygon
+    ys = np.append(y, y[0])
     plt.plot(xs, ys, linewidth=2)
 
 
 def scale(x, y, n, sfx, sfy):
     """Apply 2D scaling to polygon vertices"""
-    for i in range(n):
-        x[i] = x[i] * sfx
-        y[i] = y[i] * sfy
+    apply_to_lists(AffineTransform.scaling(sfx, sfy), x, y, n)
 
 
-def main():
-    # Read input
-    n = int(input())  # Total vertex of the polygon
-    x = []
-    y = []
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='2D polygon scaling')
+    add_input_arguments(parser)
+    parser.add_argument('--factors', type=float, nargs=2, metavar=('SFX', 'SFY'),
+                        help='scaling factors')
+    args = parser.parse_args(argv)
 
-    # Read (x,y) coordinates of vertex points
-    for i in range(n):
-        xi, yi = map(int, input().split())
-        x.append(xi)
-        y.append(yi)
+    # Read input: vertices (and parameters) in one bulk parse, or a binary file
+    points, parameters = read_input(parser, args, 2)
+    n = len(points)  # Total vertex of the polygon
+    x = points[:, 0].copy()
+    y = points[:, 1].copy()
+    sfx, sfy = resolve_parameters(parser, parameters, (args.factors, 2, 'scaling factors'))[0]
 
-    sfx, sfy = map(int, input().split())  # Scaling factors
+    if args.output:
+        # Large inputs: transform and write the vertices without plotting
+        scale(x, y, n, sfx, sfy)
+        write_points(args.output, np.column_stack([x, y]), output_dtype(args))
+        return
 
     # Setup matplotlib to mimic graphics.h behavior
     plt.figure(figsize=(10, 8))
@@ -76,6 +85,11 @@ Alternative: You can also create an input file (input.txt) with:
 
 Then run: python3 5_two_dimentional_scaling.py < input.txt
 
+Large inputs skip per-line parsing: the whole text input is parsed at once,
+or pass a binary vertex file plus the parameters as flags and write the
+result instead of plotting (see --help):
+    python3 5_two_dimentional_scaling.py --binary points.npy --factors 2 2 --output out.npy
+
 The input format is:
 - First line: number of vertices (n)
 - Next n lines: x y coordinates of each vertex
@@ -1,36 +1,43 @@
 import sys
+import argparse
+import numpy as np
 import matplotlib.pyplot as plt
+from transform_2d import (AffineTransform, add_input_arguments, apply_to_lists,
+                          output_dtype, read_input, resolve_parameters,
+                          write_points)
 
 
 def draw(x, y):
     """Draw polygon by connecting vertices"""
     n = len(x)
-    xs = x + [x[0]]  # Close the polygon
-    ys = y + [y[0]]
+    xs = np.append(x, x[0])  # Close the polygon
+    ys = np.append(y, y[0])
     plt.plot(xs, ys, linewidth=2)
 
 
 def translate(x, y, tx, ty):
     """Apply 2D translation to polygon vertices"""
-    n = len(x)
-    for i in range(n):
-        x[i] += tx
-        y[i] += ty
+    apply_to_lists(AffineTransform.translation(tx, ty), x, y)
 
 
-def main():
-    # Read input
-    n = int(input())  # Number of vertex of the polygon
-    x = []
-    y = []
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='2D polygon translation')
+    add_input_arguments(parser)
+    parser.add_argument('--offset', type=float, nargs=2, metavar=('TX', 'TY'),
+                        help='translation factors')
+    args = parser.parse_args(argv)
 
-    # Read (x,y) coordinates of vertex points
-    for i in range(n):
-        xi, yi = map(int, input().split())
-        x.append(xi)
-        y.append(yi)
+    # Read input: vertices (and parameters) in one bulk parse, or a binary file
+    points, parameters = read_input(parser, args, 2)
+    x = points[:, 0].copy()
+    y = points[:, 1].copy()
+    tx, ty = resolve_parameters(parser, parameters, (args.offset, 2, 'translation factors'))[0]
 
-    tx, ty = map(int, input().split())  # Translation factors
+    if args.output:
+        # Large inputs: transform and write the vertices without plotting
+        translate(x, y, tx, ty)
+        write_points(args.output, np.column_stack([x, y]), output_dtype(args))
+        return
 
     # Setup matplotlib to mimic graphics.h behavior
     plt.figure(figsize=(10, 8))
@@ -77,6 +84,11 @@ Alternative: You can also create an input file (input.txt) with:
 
 Then run: python3 5_two_dimentional_translation.py < input.txt
 
+Large inputs skip per-line parsing: the whole text input is parsed at once,
+or pass a binary vertex file plus the parameters as flags and write the
+result instead of plotting (see --help):
+    python3 5_two_dimentional_translation.py --binary points.npy --offset 150 150 --output out.npy
+
 The input format is:
 - First line: number of vertices (n)
 - Next n lines: x y coordinates of each vertex
@@ -0,0 +1,392 @@
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+class AffineTransform:
+    """2D affine transform held as one 3x3 homogeneous matrix
+
+    Transforms are immutable; rotate, scale and translate return a new
+    transform that applies the extra step after the existing ones, so any
+    chain collapses into a single matrix and one pass over the points.
+    """
+
+    chunk_rows = 1 << 16
+
+    def __init__(self, matrix=None):
+        self.matrix = np.eye(3) if matrix is None else np.asarray(matrix, dtype=float)
+
+    def __repr__(self):
+        return f"AffineTransform({self.matrix[:2].tolist()})"
+
+    @classmethod
+    def rotation(cls, angle, pivot=(0, 0)):
+        """Counter-clockwise rotation by angle degrees about the pivot"""
+        radian = angle * (math.pi / 180)
+        cos_term, sin_term = math.cos(radian), math.sin(radian)
+        xp, yp = pivot
+        return cls([[cos_term, -sin_term, xp - xp * cos_term + yp * sin_term],
+                    [sin_term, cos_term, yp - xp * sin_term - yp * cos_term],
+                    [0, 0, 1]])
+
+    @classmethod
+    def scaling(cls, sfx, sfy=None, pivot=(0, 0)):
+        """Scaling by sfx, sfy (sfy defaults to sfx) about the pivot"""
+        sfy = sfx if sfy is None else sfy
+        xp, yp = pivot
+        return cls([[sfx, 0, xp - xp * sfx],
+                    [0, sfy, yp - yp * sfy],
+                    [0, 0, 1]])
+
+    @classmethod
+    def translation(cls, tx, ty):
+        return cls([[1, 0, tx],
+                    [0, 1, ty],
+                    [0, 0, 1]])
+
+    def then(self, other):
+        """This transform followed by other"""
+        return AffineTransform(other.matrix @ self.matrix)
+
+    def rotate(self, angle, pivot=(0, 0)):
+        return self.then(AffineTransform.rotation(angle, pivot))
+
+    def scale(self, sfx, sfy=None, pivot=(0, 0)):
+        return self.then(AffineTransform.scaling(sfx, sfy, pivot))
+
+    def translate(self, tx, ty):
+        return self.then(AffineTransform.translation(tx, ty))
+
+    def inverse(self):
+        return AffineTransform(np.linalg.inv(self.matrix))
+
+    def apply(self, points, out=None):
+        """Transform an (N, 2) array of points in one vectorized pass
+
+        With out (which may be points itself, for an in-place update of a
+        float array) rows are processed chunk_rows at a time, so the only
+        temporary is one chunk.
+        """
+        linear = self.matrix[:2, :2].T
+        offset = self.matrix[:2, 2]
+        points = np.asarray(points)
+        if out is None:
+            return points @ linear + offset
+        for lo in range(0, len(points), self.chunk_rows):
+            hi = lo + self.chunk_rows
+            out[lo:hi] = points[lo:hi] @ linear
+            out[lo:hi] += offset
+        return out
+
+    def apply_many(self, polygons):
+        """Transform many polygons with a single pass over all their vertices
+
+        polygons is a (P, N, 2) array, or a sequence of (N_i, 2) arrays which
+        is returned as a list of arrays of the same sizes.
+        """
+        if isinstance(polygons, np.ndarray):
+            return self.apply(polygons.reshape(-1, 2)).reshape(polygons.shape)
+        polygons = [np.asarray(polygon, dtype=float).reshape(-1, 2) for polygon in polygons]
+        if not polygons:
+            return []
+        sizes = [len(polygon) for polygon in polygons]
+        points = self.apply(np.concatenate(polygons))
+        return np.split(points, np.cumsum(sizes)[:-1])
+
+
+def apply_to_lists(transform, x, y, n=None):
+    """Transform parallel x/y coordinate lists (or float arrays) in place"""
+    n = len(x) if n is None else n
+    points = transform.apply(np.column_stack([x[:n], y[:n]]).astype(float))
+    if isinstance(x, np.ndarray):
+        x[:n], y[:n] = points[:, 0], points[:, 1]
+    else:
+        x[:n] = points[:, 0].tolist()
+        y[:n] = points[:, 1].tolist()
+
+
+def read_numbers(source=None, dtype=float):
+    """Every whitespace-separated number of a text file (default stdin)
+
+    The whole input is read at once and parsed by NumPy in one call, which
+    accepts the line-per-vertex format of the 5_* programs unchanged.
+    """
+    if source is None or source == '-':
+        text = sys.stdin.read()
+    else:
+        with open(source) as f:
+            text = f.read()
+    # Raises ValueError on anything that is not a number
+    return np.fromstring(text, dtype=float, sep=' ').astype(dtype, copy=False)
+
+
+def parse_polygon(numbers, parameter_count):
+    """Split 'n, n vertex pairs, parameters' into points and parameters
+
+    Missing trailing parameters are allowed (they may come from flags
+    instead); the returned parameter array is then shorter.
+    """
+    if len(numbers) == 0:
+        raise ValueError("Empty input: expected the vertex count first")
+    n = int(numbers[0])
+    if len(numbers) < 1 + 2 * n:
+        raise ValueError(f"Expected {n} vertices, got {(len(numbers) - 1) // 2}")
+    points = numbers[1:1 + 2 * n].reshape(n, 2)
+    return points, numbers[1 + 2 * n:1 + 2 * n + parameter_count]
+
+
+def read_points(path, dtype='float64'):
+    """(N, 2) points from a binary file, never parsed as text
+
+    .npy files are memory-mapped with their own dtype; anything else is raw
+    native-endian dtype x, y pairs.
+    """
+    if path.endswith('.npy'):
+        return load_npy_points(path)
+    check_raw_size(path, dtype)
+    return np.fromfile(path, dtype=dtype).reshape(-1, 2)
+
+
+def load_npy_points(path):
+    """Memory-map an .npy file, checking that it holds an (N, 2) array"""
+    points = np.load(path, mmap_mode='r')
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError(f"{path}: expected an (N, 2) array, got shape {points.shape}")
+    return points
+
+
+def check_raw_size(path, dtype):
+    """Reject a raw file that is not a whole number of dtype x, y pairs"""
+    record = 2 * np.dtype(dtype).itemsize
+    if os.path.getsize(path) % record:
+        raise ValueError(f"{path} is not a whole number of {record}-byte points")
+
+
+def write_points(path, points, dtype='float64'):
+    """Write (N, 2) points in the layout read_points expects
+
+    Integer dtypes get the coordinates rounded to the nearest value rather
+    than truncated.
+    """
+    if np.issubdtype(np.dtype(dtype), np.integer):
+        points = np.rint(points)
+    points = np.asarray(points, dtype=dtype)
+    if path.endswith('.npy'):
+        np.save(path, points)
+    else:
+        points.tofile(path)
+
+
+def add_input_arguments(parser):
+    """--input/--binary/--dtype/--output/--output-dtype flags shared by the 5_* programs"""
+    parser.add_argument('--input', metavar='FILE',
+                        help='text input file in the sample format (default: stdin)')
+    parser.add_argument('--binary', metavar='FILE',
+                        help='binary vertex file (.npy or raw x, y pairs); '
+                             'transform parameters then come from flags')
+    parser.add_argument('--dtype', choices=['float32', 'float64', 'int32', 'int64'],
+                        default='float64', help='raw binary element type (default: float64)')
+    parser.add_argument('--output', metavar='FILE',
+                        help='write the transformed vertices here (binary) instead of plotting')
+    parser.add_argument('--output-dtype', choices=['float32', 'float64', 'int32', 'int64'],
+                        help='element type of --output (default: --dtype for float '
+                             'inputs, float64 otherwise; integer types are rounded)')
+
+
+def output_dtype(args):
+    """The --output element type; integer inputs are written as float64 unless asked"""
+    if args.output_dtype:
+        return args.output_dtype
+    return args.dtype if np.issubdtype(np.dtype(args.dtype), np.floating) else 'float64'
+
+
+def read_input(parser, args, parameter_count):
+    """Vertices and trailing text parameters selected by add_input_arguments flags
+
+    Unreadable input is reported through parser.error, like missing parameters.
+    """
+    try:
+        if args.binary:
+            return np.array(read_points(args.binary, args.dtype), dtype=float), np.empty(0)
+        return parse_polygon(read_numbers(args.input), parameter_count)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+
+def resolve_parameters(parser, parsed, *specs):
+    """Values for (flag, count, name) specs; unset flags take the next parsed numbers"""
+    values, position = [], 0
+    for flag, count, name in specs:
+        if flag is not None:
+            values.append(flag)
+        elif position + count <= len(parsed):
+            values.append(parsed[position] if count == 1 else parsed[position:position + count])
+        else:
+            parser.error(f"missing {name}: give it in the input or as a flag")
+        position += count
+    return values
+
+
+def open_points(path, dtype='float64', mode='r', count=None):
+    """Memory-map an (N, 2) point file: .npy, or raw native-endian dtype pairs
+
+    Files opened for reading must hold C-ordered float coordinates, since
+    the result is written in place in the same dtype.
+    """
+    if mode != 'r':
+        if path.endswith('.npy'):
+            return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(count, 2))
+        return np.memmap(path, dtype=dtype, mode='w+', shape=(count, 2))
+
+    if path.endswith('.npy'):
+        points = load_npy_points(path)
+        if not points.flags.c_contiguous:
+            raise ValueError(f"{path}: Fortran-ordered .npy files are not supported")
+    else:
+        check_raw_size(path, dtype)
+        points = np.memmap(path, dtype=dtype, mode='r').reshape(-1, 2)
+    if not np.issubdtype(points.dtype, np.floating):
+        raise ValueError(f"{path}: expected float coordinates, got {points.dtype}")
+    return points
+
+
+def transform_file(input_path, output_path, transform, dtype='float64',
+                   chunk_rows=1 << 20, workers=1):
+    """Apply a transform to a point file larger than memory, chunk by chunk
+
+    Every task maps just its chunk_rows points of the input and the
+    matching slice of the output, transforms them and unmaps both, so
+    resident memory stays at about one chunk per worker however large the
+    file is. NumPy releases the GIL in the matrix product, so workers > 1
+    runs chunks on a thread pool. The output keeps the input's dtype.
+    Returns (points, seconds).
+    """
+    # The output is created (truncated) before any chunk is read
+    if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+        raise ValueError(f"{output_path} is also the input file; write to another path")
+    # An empty raw file cannot even be memory-mapped
+    if not input_path.endswith('.npy') and os.path.getsize(input_path) == 0:
+        count = 0
+    else:
+        source = open_points(input_path, dtype)
+        count, dtype, source_offset = len(source), source.dtype, source.offset
+        del source
+    if count == 0:
+        write_points(output_path, np.empty((0, 2)), dtype)
+        return 0, 0.0
+
+    target = open_points(output_path, dtype, mode='w+', count=count)
+    target_offset = target.offset
+    del target
+    row_bytes = 2 * dtype.itemsize
+
+    def run(lo):
+        rows = min(chunk_rows, count - lo)
+        chunk = np.memmap(input_path, dtype, mode='r',
+                          offset=source_offset + lo * row_bytes, shape=(rows, 2))
+        out = np.memmap(output_path, dtype, mode='r+',
+                        offset=target_offset + lo * row_bytes, shape=(rows, 2))
+        transform.apply(chunk, out=out)
+        out.flush()
+
+    start = time.perf_counter()
+    chunks = range(0, count, chunk_rows)
+    if workers > 1:
+        with ThreadPoolExecutor(workers) as pool:
+            list(pool.map(run, chunks))
+    else:
+        for lo in chunks:
+            run(lo)
+    return count, time.perf_counter() - start
+
+
+class _AppendStep(argparse.Action):
+    """Collects --rotate/--scale/--translate in command-line order"""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        steps = getattr(namespace, 'steps', None) or []
+        steps.append((self.dest, values))
+        namespace.steps = steps
+
+
+def build_transform(steps):
+    transform = AffineTransform()
+    for name, values in steps:
+        if name == 'rotate':
+            angle, xp, yp = values
+            transform = transform.rotate(angle, (xp, yp))
+        elif name == 'scale':
+            transform = transform.scale(*values)
+        else:
+            transform = transform.translate(*values)
+    return transform
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Stream a composed 2D transform over a memory-mapped point file')
+    parser.add_argument('input', help='(N, 2) point file: .npy or raw x, y pairs')
+    parser.add_argument('output', help='output file, same layout and dtype')
+    parser.add_argument('--rotate', nargs=3, type=float, action=_AppendStep,
+                        metavar=('ANGLE', 'XP', 'YP'), help='rotate about a pivot (degrees)')
+    parser.add_argument('--scale', nargs=2, type=float, action=_AppendStep,
+                        metavar=('SFX', 'SFY'), help='scale about the origin')
+    parser.add_argument('--translate', nargs=2, type=float, action=_AppendStep,
+                        metavar=('TX', 'TY'), help='translate')
+    parser.add_argument('--dtype', choices=['float32', 'float64'], default='float64',
+                        help='element type of raw files (default: float64)')
+    parser.add_argument('--chunk', type=int, default=1 << 20,
+                        help='points per chunk (default: 1048576)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='threads transforming chunks (default: one per CPU)')
+    parser.set_defaults(steps=[])
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    transform = build_transform(args.steps)
+    count, elapsed = transform_file(args.input, args.output, transform, args.dtype,
+                                    args.chunk, args.workers)
+    size = os.path.getsize(args.input) / 2 ** 20
+    elapsed = max(elapsed, 1e-9)
+    print(f"Transformed {count} points in {elapsed:.2f}s: {count / elapsed:,.0f} points/s, "
+          f"{size / elapsed:,.0f} MB/s ({args.workers} workers)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
+
+"""
+2D Affine Transformations
+
+Shared by the 5_two_dimentional_* programs. AffineTransform composes
+rotation about a pivot, scaling and translation into one 3x3 homogeneous
+matrix:
+
+    [x']   [a  b  tx] [x]
+    [y'] = [c  d  ty] [y]
+    [1 ]   [0  0  1 ] [1]
+
+so a chain such as
+
+    AffineTransform.rotation(45, (200, 200)).scale(2, 2).translate(150, 150)
+
+costs a single vectorized pass over an (N, 2) point array, instead of one
+Python loop per step. apply_many transforms a whole set of polygons at
+once by stacking their vertices.
+
+Input helpers read a whole text input at once (read_numbers) or binary
+vertex files (read_points), so large polygons skip per-line parsing:
+
+    python3 5_two_dimentional_rotaion.py --binary cloud.npy --angle 45 --pivot 200 200 --output out.npy
+
+Point clouds larger than memory are streamed through a composed transform
+in fixed-size chunks of a memory-mapped file (steps apply in flag order):
+
+    python3 transform_2d.py cloud.f32 moved.f32 --dtype float32 --rotate 45 200 200 --scale 2 2 --workers 4
+"""